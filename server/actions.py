@@ -192,7 +192,7 @@ class Actions(EventEmitter):
             upper_spread = strumming_cfg.get('upperNoteSpread', 0)
             
             # Apply note spread and set strummer notes
-            strummer.notes = Note.fill_note_spread(notes, lower_spread, upper_spread)
+            strummer.notes = Note.note_spread(notes, lower_spread, upper_spread)
             
             # Log the action
             button = context.get('button', 'Unknown')
@@ -238,8 +238,8 @@ class Actions(EventEmitter):
             lower_spread = strumming_cfg.get('lowerNoteSpread', 0)
             upper_spread = strumming_cfg.get('upperNoteSpread', 0)
             
-            # Apply note spread and set strummer notes
-            strummer.notes = Note.fill_note_spread(notes, lower_spread, upper_spread)
+            # Apply note spread (cached per chord and spread) and set strummer notes
+            strummer.notes = Note.chord_strings(chord_notation, octave, lower_spread, upper_spread)
             
             # Log the action
             button = context.get('button', 'Unknown')
@@ -284,7 +284,13 @@ class Actions(EventEmitter):
         
         # Load progression if different from current
         if self.progression_state.progression_name != progression_name:
-            if not self.progression_state.load_progression(progression_name):
+            strumming_cfg = self.config.get('strumming', {})
+            if not self.progression_state.load_progression(
+                progression_name,
+                octave,
+                strumming_cfg.get('lowerNoteSpread', 0),
+                strumming_cfg.get('upperNoteSpread', 0)
+            ):
                 return
         
         # Set the index
@@ -308,8 +314,8 @@ class Actions(EventEmitter):
             lower_spread = strumming_cfg.get('lowerNoteSpread', 0)
             upper_spread = strumming_cfg.get('upperNoteSpread', 0)
             
-            # Apply note spread and set strummer notes
-            strummer.notes = Note.fill_note_spread(notes, lower_spread, upper_spread)
+            # Apply note spread (cached per chord and spread) and set strummer notes
+            strummer.notes = Note.chord_strings(chord_notation, octave, lower_spread, upper_spread)
             
             # Log the action
             button = context.get('button', 'Unknown')
@@ -353,7 +359,13 @@ class Actions(EventEmitter):
         
         # Load progression if different from current
         if self.progression_state.progression_name != progression_name:
-            if not self.progression_state.load_progression(progression_name):
+            strumming_cfg = self.config.get('strumming', {})
+            if not self.progression_state.load_progression(
+                progression_name,
+                octave,
+                strumming_cfg.get('lowerNoteSpread', 0),
+                strumming_cfg.get('upperNoteSpread', 0)
+            ):
                 return
         
         # Increment the index
@@ -377,8 +389,8 @@ class Actions(EventEmitter):
             lower_spread = strumming_cfg.get('lowerNoteSpread', 0)
             upper_spread = strumming_cfg.get('upperNoteSpread', 0)
             
-            # Apply note spread and set strummer notes
-            strummer.notes = Note.fill_note_spread(notes, lower_spread, upper_spread)
+            # Apply note spread (cached per chord and spread) and set strummer notes
+            strummer.notes = Note.chord_strings(chord_notation, octave, lower_spread, upper_spread)
             
             # Log the action
             button = context.get('button', 'Unknown')
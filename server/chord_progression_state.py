@@ -19,12 +19,17 @@ class ChordProgressionState:
         self.chords: List[str] = []
         self.current_index: int = 0
     
-    def load_progression(self, progression_name: str) -> bool:
+    def load_progression(self, progression_name: str, octave: int = 4, lower_spread: int = 0,
+                         upper_spread: int = 0) -> bool:
         """
-        Load a chord progression by name.
+        Load a chord progression by name and prefetch the strings of all its chords,
+        so moving through the progression only looks them up.
         
         Args:
             progression_name: Name of the progression to load
+            octave: Base octave the chords will be played in
+            lower_spread: Number of notes added below each chord
+            upper_spread: Number of notes added above each chord
             
         Returns:
             True if progression was loaded successfully, False otherwise
@@ -40,6 +45,9 @@ class ChordProgressionState:
         self.chords = Note.chord_progressions[progression_name]
         self.current_index = 0
         
+        for chord in self.chords:
+            Note.chord_strings(chord, octave, lower_spread, upper_spread)
+        
         print(f"[ChordProgressionState] Loaded progression '{progression_name}' with {len(self.chords)} chords")
         return True
     
@@ -16,6 +16,7 @@ class Config:
         "startupConfiguration": {
             "midiOutputBackend": "rtmidi",  # Options: "rtmidi", "jack"
             "jackClientName": "strumboli",  # Name for Jack client (only used if backend is "jack")
+            "hidBackend": "hidapi",  # Options: "hidapi", "hidraw" (Linux only - one epoll thread for all interfaces)
             "drawingTablet": {
                 "product": "Deco 640",
                 "usage": 1,
@@ -57,7 +58,8 @@ class Config:
             },
             "useSocketServer": True,
             "socketServerPort": 8080,
-            "midiInputId": None
+            "midiInputId": None,
+            "midiInputCoalesceMs": 8  # Collect MIDI input note bursts (chords) for this long before updating notes
         },
         "noteDuration": {
             "min": 0.15,
@@ -87,12 +89,16 @@ class Config:
             "default": 64
         },
         "strumming": {
-            "pluckVelocityScale": 4.0,
             "pressureThreshold": 0.1,
             "midiChannel": None,
             "initialNotes": ["C4", "E4", "G4"],
             "upperNoteSpread": 3,
-            "lowerNoteSpread": 3
+            "lowerNoteSpread": 3,
+            "stringWidths": [],
+            "primaryStringWidth": 1.0,
+            "deadZone": 0.0,
+            "hysteresis": 0.0,
+            "velocityCurve": 1.0
         },
         "noteRepeater": {
             "active": False,
@@ -507,6 +513,11 @@ class Config:
         """Get MIDI input ID."""
         return self._config.get('startupConfiguration', {}).get('midiInputId')
     
+    @property
+    def midi_input_coalesce_ms(self) -> float:
+        """Get how long bursts of MIDI input note events are collected for (milliseconds, 0 = off)."""
+        return self._config.get('startupConfiguration', {}).get('midiInputCoalesceMs', 8)
+    
     @property
     def midi_output_backend(self) -> str:
         """Get MIDI output backend (rtmidi or jack)."""
@@ -517,6 +528,26 @@ class Config:
         """Get Jack client name."""
         return self._config.get('startupConfiguration', {}).get('jackClientName', 'midi_strummer')
     
+    @property
+    def hid_backend(self) -> str:
+        """Get HID input backend (hidapi or hidraw)."""
+        return self._config.get('startupConfiguration', {}).get('hidBackend', 'hidapi')
+    
+    @property
+    def hid_capture_file(self) -> Optional[str]:
+        """Get path of the file raw HID reports are recorded to (None = no capture)."""
+        return self._config.get('startupConfiguration', {}).get('hidCaptureFile')
+    
+    @property
+    def hid_replay_file(self) -> Optional[str]:
+        """Get path of a HID capture to replay instead of reading a tablet (None = use tablet)."""
+        return self._config.get('startupConfiguration', {}).get('hidReplayFile')
+    
+    @property
+    def hid_replay_realtime(self) -> bool:
+        """Get whether replay reproduces recorded timing (False = as fast as possible)."""
+        return self._config.get('startupConfiguration', {}).get('hidReplayRealtime', True)
+    
     @property
     def jack_auto_connect(self) -> str:
         """Get Jack auto-connect mode."""
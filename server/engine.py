@@ -0,0 +1,240 @@
+"""
+Strum Engine Thread
+
+HID reader threads push decoded samples into a bounded queue. A single
+engine thread drains it and runs the data handler, so all strum, effect and
+MIDI state is only ever touched from one thread, and samples from different
+interfaces are processed in the order they were read.
+
+The engine also runs timers (e.g. the note repeater). A timer is any object
+with next_deadline() -> Optional[int] (a time.monotonic_ns() value) and
+fire(now_ns); the engine sleeps until the earliest deadline or the next sample.
+"""
+
+import time
+import threading
+from collections import deque
+from itertools import islice
+from typing import Callable, Deque, Dict, Any, List, Optional, TYPE_CHECKING
+
+from hidreader import coalesce_samples, is_no_contact, is_redundant, same_state, SAMPLE_STYLUS
+
+if TYPE_CHECKING:
+    from hidreader import TabletSample
+
+
+# Default number of samples the queue holds before the oldest are dropped
+DEFAULT_QUEUE_SIZE = 256
+
+
+class StrumEngine:
+    """
+    Runs the sample handler on a dedicated thread.
+
+    push() may be called from any number of reader threads. Before a backlog
+    is dispatched, runs of redundant hover samples are collapsed (see
+    coalesce_samples). If the engine falls so far behind that the queue is
+    full, a redundant hover sample is dropped first, then a contact sample in
+    the middle of a stroke; contact and button transitions are never dropped
+    while anything else can be. Work from other threads (MIDI input, config updates) that touches strum
+    state is run on the engine thread with call_soon().
+    """
+
+    def __init__(self, handler: Callable[['TabletSample'], None], queue_size: int = DEFAULT_QUEUE_SIZE,
+                 timers: Optional[List[Any]] = None):
+        """
+        Initialize the engine
+
+        Args:
+            handler: Called on the engine thread for every sample
+            queue_size: Maximum number of samples waiting to be processed
+            timers: Timer objects to run on the engine thread
+        """
+        self.handler = handler
+        self.timers: List[Any] = list(timers or [])
+        self.queue_size = queue_size
+        self._samples: Deque['TabletSample'] = deque()
+        self._calls: Deque[Callable[[], None]] = deque()
+        self._push_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.is_running = False
+
+        # Statistics
+        self.processed = 0
+        self.coalesced = 0  # Redundant hover samples skipped
+        self.dropped = 0  # Samples lost because the queue was full
+        self.max_depth = 0
+
+    def set_handler(self, handler: Callable[['TabletSample'], None]) -> None:
+        """
+        Replace the sample handler (e.g. after a device is reconnected)
+
+        Args:
+            handler: Called on the engine thread for every sample
+        """
+        self.handler = handler
+
+    def push(self, sample: 'TabletSample') -> None:
+        """
+        Queue a sample for processing. Safe to call from any thread.
+
+        Args:
+            sample: Decoded tablet sample
+        """
+        with self._push_lock:
+            samples = self._samples
+            samples.append(sample)
+            depth = len(samples)
+            if depth > self.queue_size:
+                self._shed_locked()
+            elif depth > self.max_depth:
+                self.max_depth = depth
+        self._wake.set()
+    
+    def _shed_locked(self) -> None:
+        """Remove one sample from a full queue, keeping every transition if possible (caller holds the lock)"""
+        samples = self._samples
+        
+        # A hover sample followed by an identical hover sample carries nothing
+        for i, (sample, following) in enumerate(zip(samples, islice(samples, 1, None))):
+            if is_redundant(sample, following):
+                del samples[i]
+                self.coalesced += 1
+                return
+        
+        # Otherwise lose a contact sample in the middle of a stroke
+        for i, (previous, sample, following) in enumerate(
+                zip(samples, islice(samples, 1, None), islice(samples, 2, None))):
+            if (sample.kind == SAMPLE_STYLUS and not is_no_contact(sample)
+                    and same_state(previous, sample) and same_state(sample, following)):
+                del samples[i + 1]
+                self.dropped += 1
+                return
+        
+        # Every queued sample is a transition: the oldest is the most stale
+        samples.popleft()
+        self.dropped += 1
+
+    def call_soon(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback on the engine thread. Runs it immediately if the engine
+        is not running.
+
+        Args:
+            callback: Function to call with no arguments
+        """
+        if not self.is_running:
+            callback()
+            return
+        self._calls.append(callback)
+        self._wake.set()
+
+    @property
+    def depth(self) -> int:
+        """Number of samples waiting to be processed"""
+        return len(self._samples)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with current depth, max depth, processed, coalesced and dropped counts
+        """
+        return {
+            'depth': len(self._samples),
+            'maxDepth': self.max_depth,
+            'queueSize': self.queue_size,
+            'processed': self.processed,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped
+        }
+
+    def start(self) -> None:
+        """Start the engine thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, name='StrumEngine', daemon=True)
+        self._thread.start()
+        print(f"[Engine] Started (queue size {self.queue_size})")
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """
+        Stop the engine thread after it finishes the samples already queued
+
+        Args:
+            timeout: Maximum time to wait for the thread to exit (seconds)
+        """
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        stats = self.get_stats()
+        print(f"[Engine] Stopped: {stats['processed']} samples processed, {stats['coalesced']} redundant skipped, "
+              f"{stats['dropped']} dropped, max queue depth {stats['maxDepth']}")
+
+    def _next_timeout(self) -> Optional[float]:
+        """Get the time until the earliest timer deadline (seconds), or None if no timer is due"""
+        earliest = None
+        for timer in self.timers:
+            deadline = timer.next_deadline()
+            if deadline is not None and (earliest is None or deadline < earliest):
+                earliest = deadline
+        if earliest is None:
+            return None
+        return max(0.0, (earliest - time.monotonic_ns()) / 1e9)
+
+    def _fire_timers(self) -> None:
+        """Fire every timer whose deadline has passed"""
+        now_ns = time.monotonic_ns()
+        for timer in self.timers:
+            deadline = timer.next_deadline()
+            if deadline is not None and deadline <= now_ns:
+                try:
+                    timer.fire(now_ns)
+                except Exception as e:
+                    print(f"[Engine] Error in timer: {e}")
+
+    def _run(self) -> None:
+        """Engine thread: wait for work or the next timer deadline, and process it in arrival order"""
+        samples = self._samples
+        calls = self._calls
+
+        while True:
+            self._wake.wait(self._next_timeout())
+            # Clear before draining: anything pushed from now on sets it again
+            self._wake.clear()
+
+            while calls:
+                try:
+                    calls.popleft()()
+                except Exception as e:
+                    print(f"[Engine] Error in callback: {e}")
+
+            while samples:
+                # Take the whole backlog and skip its redundant hover samples
+                with self._push_lock:
+                    batch = list(samples)
+                    samples.clear()
+                if len(batch) > 1:
+                    kept = coalesce_samples(batch)
+                    self.coalesced += len(batch) - len(kept)
+                    batch = kept
+                
+                for sample in batch:
+                    try:
+                        self.handler(sample)
+                    except Exception as e:
+                        print(f"[Engine] Error handling sample: {e}")
+                    self.processed += 1
+
+            if self.timers:
+                self._fire_timers()
+
+            if not self.is_running:
+                break
@@ -0,0 +1,272 @@
+"""
+HID Capture and Replay
+
+Records raw HID reports to a compact, append-only binary file and replays
+them through the normal decode -> data handler pipeline, so the strum
+engine can be exercised and benchmarked without a physical tablet.
+
+File layout (little-endian):
+    header:  8-byte magic b'STRMHID1'
+    record:  uint64 monotonic timestamp (ns), int16 interface number,
+             uint16 report length, followed by the raw report bytes
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import threading
+from typing import Dict, Any, Callable, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from hidreader import HIDReader, TabletSample
+
+if TYPE_CHECKING:
+    from config import Config
+    from engine import StrumEngine
+
+
+CAPTURE_MAGIC = b'STRMHID1'
+_RECORD = struct.Struct('<QhH')
+
+# How long a fast replay waits for the engine queue to drain (seconds)
+_BACKPRESSURE_WAIT = 0.001
+
+
+class CaptureWriter:
+    """Appends raw HID reports to a capture file. Safe to share between reader threads."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a capture file for appending
+
+        Args:
+            path: Capture file path
+        """
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(CAPTURE_MAGIC)
+        else:
+            with open(path, 'rb') as f:
+                if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+                    self._file.close()
+                    raise ValueError(f"'{path}' is not a HID capture file")
+        print(f"[Capture] Recording raw HID reports to {path}")
+
+    def write(self, interface_num: int, data, timestamp_ns: Optional[int] = None) -> None:
+        """
+        Append one report
+
+        Args:
+            interface_num: Interface the report was read from
+            data: Raw report (list of ints or bytes-like)
+            timestamp_ns: time.monotonic_ns() when the read returned (defaults to now)
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        payload = bytes(data)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_RECORD.pack(timestamp_ns, interface_num, len(payload)))
+            self._file.write(payload)
+            self.count += 1
+
+    def close(self) -> None:
+        """Flush and close the capture file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                print(f"[Capture] Closed {self.path} ({self.count} reports recorded)")
+
+
+class CaptureReader:
+    """Memory-maps a capture file and iterates over its records"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Capture file path
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(CAPTURE_MAGIC):
+                raise ValueError(f"'{path}' is not a HID capture file")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+            self._map.close()
+            raise ValueError(f"'{path}' is not a HID capture file")
+
+    def __iter__(self) -> Iterator[Tuple[int, int, bytes]]:
+        """Yield (timestamp_ns, interface_num, report) tuples in file order"""
+        data = self._map
+        offset = len(CAPTURE_MAGIC)
+        end = len(data)
+        unpack_from = _RECORD.unpack_from
+        record_size = _RECORD.size
+
+        while offset + record_size <= end:
+            timestamp_ns, interface_num, length = unpack_from(data, offset)
+            offset += record_size
+            if offset + length > end:
+                break  # Truncated final record (capture was interrupted)
+            yield timestamp_ns, interface_num, data[offset:offset + length]
+            offset += length
+
+    def close(self) -> None:
+        """Release the memory map"""
+        self._map.close()
+
+
+class ReplaySource:
+    """
+    Feeds a capture file through the HID decode pipeline.
+
+    Exposes the same start_reading/stop/close interface as HIDReader so main
+    can use it in place of a physical tablet.
+    """
+
+    def __init__(self, path: str, config: 'Config', data_callback: Callable[[TabletSample], None],
+                 warning_callback: Optional[Callable[[str], None]] = None, realtime: bool = True,
+                 engine: Optional['StrumEngine'] = None):
+        """
+        Initialize replay
+
+        Args:
+            path: Capture file path
+            config: Configuration instance with device byte code mappings
+            data_callback: Callback function to handle decoded samples
+            warning_callback: Optional callback function to send warnings
+            realtime: Reproduce the recorded timing if True, otherwise replay as fast as possible
+            engine: Strum engine fed by data_callback; replaying as fast as possible waits
+                while its queue is full instead of overflowing it
+        """
+        self.path = path
+        self.config = config
+        self.data_callback = data_callback
+        self.warning_callback = warning_callback
+        self.realtime = realtime
+        self.engine = engine
+        self.is_running = False
+        self._decoders: Dict[int, HIDReader] = {}
+        self._stop_event = threading.Event()
+        self._loop_exited = threading.Event()
+        self._loop_exited.set()  # No loop running yet
+
+    def _decoder_for(self, interface_num: int) -> HIDReader:
+        """Get the decoder for an interface, creating it on first use"""
+        decoder = self._decoders.get(interface_num)
+        if decoder is None:
+            decoder = HIDReader(None, self.config, self.data_callback, self.warning_callback,
+                                interface_num=interface_num)
+            self._decoders[interface_num] = decoder
+        return decoder
+
+    def start_reading(self, **kwargs):
+        """Replay the capture until it ends or stop() is called"""
+        reader = CaptureReader(self.path)
+        self.is_running = True
+        self._stop_event.clear()
+        self._loop_exited.clear()
+
+        count = 0
+        first_timestamp = None
+        start = time.monotonic()
+        start_ns = time.monotonic_ns()
+        engine = self.engine
+        dropped_before = engine.dropped if engine is not None else 0
+
+        print(f"[Replay] Replaying {self.path} ({'real time' if self.realtime else 'as fast as possible'})...")
+
+        try:
+            for timestamp_ns, interface_num, report in reader:
+                if not self.is_running:
+                    break
+
+                if first_timestamp is None:
+                    first_timestamp = timestamp_ns
+                # Recorded timing, rebased onto now, so strum velocity sees the
+                # original sample intervals even when replaying as fast as possible
+                replay_timestamp_ns = start_ns + (timestamp_ns - first_timestamp)
+
+                if self.realtime:
+                    delay = (replay_timestamp_ns - time.monotonic_ns()) / 1e9
+                    if delay > 0 and self._stop_event.wait(delay):
+                        break
+                elif engine is not None:
+                    # Backpressure: let the engine catch up rather than overflow its queue
+                    while engine.depth >= engine.queue_size and not self._stop_event.wait(_BACKPRESSURE_WAIT):
+                        pass
+                    if not self.is_running:
+                        break
+
+                try:
+                    # Latency and timers are measured from the real handoff time
+                    self._decoder_for(interface_num).handle_report(report, replay_timestamp_ns,
+                                                                   time.monotonic_ns())
+                except Exception as e:
+                    print(f"[Replay] Unexpected error: {e}")
+                count += 1
+        finally:
+            reader.close()
+            self.is_running = False
+            self._loop_exited.set()
+
+        elapsed = time.monotonic() - start
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"[Replay] Finished: {count} reports in {elapsed:.3f}s ({rate:.0f} reports/s)")
+        if engine is not None:
+            print(f"[Replay] Engine dropped {engine.dropped - dropped_before} samples during replay")
+
+    def stop(self):
+        """Stop the replay"""
+        print("[Replay] Stopping replay...")
+        self.is_running = False
+        self._stop_event.set()
+
+    def wait_stopped(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the replay loop to exit after stop().
+
+        Args:
+            timeout: Maximum time to wait (seconds), or None to wait indefinitely
+
+        Returns:
+            True if the loop is not running
+        """
+        return self._loop_exited.wait(timeout)
+
+    def close(self):
+        """Wait for the replay loop to finish"""
+        self.wait_stopped(timeout=1.0)
+
+
+if __name__ == "__main__":
+    # Print a summary of a capture file
+    if len(sys.argv) != 2:
+        print("Usage: python hidcapture.py <capture-file>")
+        sys.exit(1)
+
+    capture = CaptureReader(sys.argv[1])
+    total = 0
+    per_interface: Dict[int, int] = {}
+    first = last = None
+    for timestamp_ns, interface_num, report in capture:
+        total += 1
+        per_interface[interface_num] = per_interface.get(interface_num, 0) + 1
+        first = timestamp_ns if first is None else first
+        last = timestamp_ns
+    capture.close()
+
+    duration = (last - first) / 1e9 if total > 1 else 0.0
+    print(f"Reports:    {total}")
+    print(f"Duration:   {duration:.3f}s")
+    if duration > 0:
+        print(f"Rate:       {total / duration:.1f} reports/s")
+    for interface_num, count in sorted(per_interface.items()):
+        print(f"Interface {interface_num}: {count} reports")
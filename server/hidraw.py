@@ -0,0 +1,305 @@
+"""
+Linux hidraw Backend
+
+Reads tablet interfaces directly from /dev/hidrawN and serves every
+interface (stylus, buttons) from a single epoll-driven thread, instead of
+one HIDReader thread per interface.
+"""
+
+import os
+import sys
+import glob
+import select
+import threading
+import time
+from typing import Dict, Any, List, Tuple, Callable, Optional, TYPE_CHECKING
+
+from hidreader import HIDReader, TabletSample, MAX_BATCH_SIZE
+
+if TYPE_CHECKING:
+    from config import Config
+    from hidcapture import CaptureWriter
+
+
+def is_available() -> bool:
+    """Check whether the hidraw backend can be used on this platform"""
+    return sys.platform.startswith('linux') and hasattr(select, 'epoll') and os.path.isdir('/sys/class/hidraw')
+
+
+def _read_sysfs(path: str) -> Optional[str]:
+    """Read a sysfs attribute, returning None if it is missing"""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def find_hidraw_node(device_info: Dict[str, Any]) -> Optional[str]:
+    """
+    Resolve a hid.enumerate() entry to its /dev/hidrawN node.
+
+    hidapi's hidraw build reports the node directly as the path. The libusb
+    build reports the USB interface instead (e.g. "1-1:1.0"), so sysfs is
+    searched for the hidraw device below that interface, then for a matching
+    vendor/product and interface number.
+
+    Args:
+        device_info: HID device information from hid.enumerate()
+
+    Returns:
+        Device node path, or None if it could not be found
+    """
+    path = device_info.get('path') or b''
+    if isinstance(path, bytes):
+        path = path.decode('utf-8', errors='replace')
+    if path.startswith('/dev/hidraw'):
+        return path
+
+    vendor_id = device_info.get('vendor_id')
+    product_id = device_info.get('product_id')
+    interface_num = device_info.get('interface_number', -1)
+
+    for node in sorted(glob.glob('/sys/class/hidraw/hidraw*')):
+        hid_device = os.path.realpath(os.path.join(node, 'device'))
+        usb_interface = os.path.dirname(hid_device)
+        node_path = '/dev/' + os.path.basename(node)
+
+        if path and os.path.basename(usb_interface) == path:
+            return node_path
+
+        # uevent contains e.g. HID_ID=0003:000028BD:00002904
+        uevent = _read_sysfs(os.path.join(hid_device, 'uevent')) or ''
+        for line in uevent.splitlines():
+            if line.startswith('HID_ID='):
+                _, vendor, product = line[len('HID_ID='):].split(':')
+                if int(vendor, 16) != vendor_id or int(product, 16) != product_id:
+                    break
+                node_interface = _read_sysfs(os.path.join(usb_interface, 'bInterfaceNumber'))
+                if node_interface is not None and int(node_interface, 16) == interface_num:
+                    return node_path
+                break
+
+    return None
+
+
+def find_hidraw_interfaces(tablet_config: Dict[str, Any]) -> List[Tuple[int, str]]:
+    """
+    Find the hidraw nodes for the specified tablet device interfaces.
+
+    Args:
+        tablet_config: Drawing tablet configuration (from startupConfiguration.drawingTablet)
+
+    Returns:
+        List of tuples: [(interface_num, node_path), ...]
+    """
+    from finddevice import find_all_interface_infos
+
+    interfaces = []
+    for device_info in find_all_interface_infos(tablet_config):
+        interface_num = device_info.get('interface_number', -1)
+        node = find_hidraw_node(device_info)
+        if node is None:
+            print(f"[hidraw] Could not find hidraw node for interface {interface_num}")
+            continue
+        interfaces.append((interface_num, node))
+    return interfaces
+
+
+class HidrawMultiplexer:
+    """
+    Reads several hidraw interfaces from one thread using epoll.
+
+    Exposes the same start_reading/stop/close interface as HIDReader, so it
+    can be managed alongside (or instead of) hidapi readers. Each interface
+    keeps its own HIDReader for decoding and Report ID bookkeeping.
+    """
+
+    def __init__(self, interfaces: List[Tuple[int, str]], config: 'Config',
+                 data_callback: Callable[[TabletSample], None],
+                 warning_callback: Optional[Callable[[str], None]] = None,
+                 capture: Optional['CaptureWriter'] = None):
+        """
+        Initialize the multiplexer
+
+        Args:
+            interfaces: List of (interface_num, hidraw node path) tuples
+            config: Configuration instance with device byte code mappings
+            data_callback: Callback function to handle decoded samples
+            warning_callback: Optional callback function to send warnings (e.g., via websocket)
+            capture: Optional capture writer that records every raw report
+        """
+        self.interfaces = interfaces
+        self.config = config
+        self.data_callback = data_callback
+        self.warning_callback = warning_callback
+        self.capture = capture
+        self.is_running = False
+
+        # fd -> (interface_num, decoder)
+        self._fds: Dict[int, Tuple[int, HIDReader]] = {}
+        self._epoll: Optional[select.epoll] = None
+        self._loop_exited = threading.Event()
+        self._loop_exited.set()  # No loop running yet
+
+        # Self-pipe used to wake the epoll wait on stop()
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+        os.set_blocking(self._wake_write, False)
+
+    def open(self) -> bool:
+        """
+        Open every hidraw node and register it with epoll.
+
+        Returns:
+            True if at least one interface was opened
+        """
+        self._epoll = select.epoll()
+        self._epoll.register(self._wake_read, select.EPOLLIN)
+
+        for interface_num, node in self.interfaces:
+            try:
+                fd = os.open(node, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+            except OSError as e:
+                print(f"[hidraw] Error opening interface {interface_num} ({node}): {e}")
+                continue
+
+            decoder = HIDReader(None, self.config, self.data_callback, self.warning_callback,
+                                interface_num=interface_num, capture=self.capture)
+            self._fds[fd] = (interface_num, decoder)
+            self._epoll.register(fd, select.EPOLLIN)
+            print(f"[hidraw] Opened interface {interface_num} ({node})")
+
+        return len(self._fds) > 0
+
+    def start_reading(self, buffer_size: int = 64, read_timeout_ms: int = 100, **kwargs):
+        """
+        Read from all interfaces until stopped
+
+        Args:
+            buffer_size: Size of the reused read buffer in bytes
+            read_timeout_ms: Maximum time a single epoll wait blocks (milliseconds)
+        """
+        if self._epoll is None and not self.open():
+            raise ValueError("No hidraw interfaces available for reading")
+
+        self.is_running = True
+        self._loop_exited.clear()
+
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        timeout = read_timeout_ms / 1000.0
+
+        print(f"[hidraw] Starting epoll reading loop for {len(self._fds)} interface(s)...")
+
+        try:
+            while self.is_running and self._fds:
+                try:
+                    events = self._epoll.poll(timeout)
+                except InterruptedError:
+                    continue
+
+                for fd, event_mask in events:
+                    if fd == self._wake_read:
+                        self._drain_wake_pipe()
+                        continue
+
+                    if event_mask & (select.EPOLLERR | select.EPOLLHUP):
+                        self._drop_interface(fd, "device disconnected")
+                        continue
+
+                    decoder = self._fds[fd][1]
+                    # Each read returns exactly one report; drain the kernel queue and
+                    # hand the backlog over as one batch so stale hover reports can be skipped
+                    samples = []
+                    while len(samples) < MAX_BATCH_SIZE:
+                        try:
+                            length = os.readv(fd, [buffer])
+                        except BlockingIOError:
+                            break
+                        except OSError as e:
+                            self._drop_interface(fd, str(e))
+                            break
+                        if length <= 0:
+                            break
+                        timestamp_ns = time.monotonic_ns()
+                        try:
+                            samples.append(decoder.decode_report(view[:length], timestamp_ns))
+                        except Exception as e:
+                            print(f"[hidraw] Unexpected error: {e}")
+                    if samples:
+                        try:
+                            decoder.handle_samples(samples)
+                        except Exception as e:
+                            print(f"[hidraw] Unexpected error: {e}")
+        finally:
+            self.is_running = False
+            self._loop_exited.set()
+
+        read = sum(decoder.samples_read for _, decoder in self._fds.values())
+        dropped = sum(decoder.samples_dropped for _, decoder in self._fds.values())
+        if dropped:
+            print(f"[hidraw] Skipped {dropped} of {read} reports while catching up")
+        print("[hidraw] Reading loop stopped")
+
+    def _drain_wake_pipe(self) -> None:
+        """Discard pending wake-up bytes"""
+        try:
+            while os.read(self._wake_read, 64):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _drop_interface(self, fd: int, reason: str) -> None:
+        """Unregister and close an interface that failed"""
+        interface_num = self._fds.pop(fd, (None,))[0]
+        print(f"[hidraw] Interface {interface_num} removed: {reason}")
+        try:
+            self._epoll.unregister(fd)
+        except (OSError, ValueError):
+            pass
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+    def stop(self):
+        """Stop the reading loop"""
+        print("[hidraw] Stopping hidraw reader...")
+        self.is_running = False
+        try:
+            os.write(self._wake_write, b'\0')
+        except OSError:
+            pass
+
+    def wait_stopped(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the reading loop to exit after stop().
+
+        Args:
+            timeout: Maximum time to wait (seconds), or None to wait indefinitely
+
+        Returns:
+            True if the loop is not running
+        """
+        return self._loop_exited.wait(timeout)
+
+    def close(self):
+        """Close all hidraw nodes"""
+        if not self.wait_stopped(timeout=1.0):
+            print("[hidraw] Warning: reading loop still active while closing")
+
+        for fd in list(self._fds):
+            self._drop_interface(fd, "closed")
+
+        if self._epoll is not None:
+            self._epoll.close()
+            self._epoll = None
+
+        for fd in (self._wake_read, self._wake_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._wake_read = self._wake_write = -1
+        print("[hidraw] Interfaces closed")
@@ -7,19 +7,358 @@ and processing the raw data according to configuration byte code mappings.
 
 import time
 import struct
-from typing import Dict, Any, Union, Callable, Optional, TYPE_CHECKING
-
-from datahelpers import parse_code, parse_range_data, parse_bipolar_range_data, parse_multi_byte_range_data, parse_bit_flags
+import threading
+from typing import Dict, Any, Callable, Optional, List, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from config import Config
+    from hidcapture import CaptureWriter
+
+
+# Report ID used by the button-only interface on Linux
+BUTTON_REPORT_ID = 6
+
+# Most reports drained from the device in one wake-up
+MAX_BATCH_SIZE = 64
+
+# Stylus states in which the pen is not touching the tablet
+NO_CONTACT_STATES = ('hover', 'none')
+
+# Little-endian struct formats for contiguous multi-byte values, by byte count
+_MULTI_BYTE_FORMATS = {1: struct.Struct('<B'), 2: struct.Struct('<H'), 4: struct.Struct('<I')}
+
+# Sample kinds - decides which handler a sample is routed to
+SAMPLE_STYLUS = 0
+SAMPLE_BUTTONS = 1
+
+# byteCodeMappings keys -> TabletSample attributes (stylus-only values)
+_SAMPLE_ATTRIBUTES = {'x': 'x', 'y': 'y', 'pressure': 'pressure', 'tiltX': 'tilt_x', 'tiltY': 'tilt_y'}
+
+
+class TabletSample:
+    """
+    One decoded HID report.
+    
+    A fixed-layout record replaces the per-report dictionary: attribute access
+    is cheaper than key lookups and no per-button keys need to be built.
+    Tablet buttons are a bitmask (bit 0 = button 1).
+    """
+    
+    __slots__ = ('x', 'y', 'pressure', 'tilt_x', 'tilt_y', 'state', 'primary_button', 'secondary_button',
+                 'buttons', 'report_id', 'interface', 'timestamp_ns', 'received_ns', 'kind')
+    
+    def __init__(self, report_id: int = 0, kind: int = SAMPLE_STYLUS):
+        self.x = 0.0
+        self.y = 0.0
+        self.pressure = 0.0
+        self.tilt_x = 0.0
+        self.tilt_y = 0.0
+        self.state: Optional[str] = None
+        self.primary_button = False
+        self.secondary_button = False
+        self.buttons = 0
+        self.report_id = report_id
+        self.interface = -1
+        self.timestamp_ns = 0
+        self.received_ns = 0  # When the report entered the pipeline (differs from timestamp_ns on replay)
+        self.kind = kind
+    
+    def button_pressed(self, button_num: int) -> bool:
+        """Check whether tablet button 1-8 is pressed"""
+        return bool(self.buttons & (1 << (button_num - 1)))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the sample as a dictionary (for logging and debugging)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __repr__(self) -> str:
+        return f"TabletSample({self.to_dict()})"
+
+
+# Fast setters for the sample attributes a mapping can write
+_SETTERS = {key: getattr(TabletSample, attr).__set__ for key, attr in _SAMPLE_ATTRIBUTES.items()}
+
+# Status fields for a status code: (state, primary button, secondary button)
+StatusEntry = Tuple[Optional[str], bool, bool]
+
+# An operation writes one decoded value into the sample.
+# It is paired with the minimum report length it needs to run.
+DecodeOp = Tuple[int, Callable[[bytes, TabletSample], None]]
+
+
+class DecodePlan:
+    """
+    Precompiled decode operations for one kind of HID report.
+    
+    Built once from the byteCodeMappings so that decoding a report is a status
+    table lookup followed by a flat run over precomputed operations.
+    """
+    
+    __slots__ = ('status_index', 'status_table', 'status_missing', 'ops', 'button_ops', 'kind')
+    
+    def __init__(self, status_index: Optional[int], status_table: Dict[int, StatusEntry],
+                 status_missing: StatusEntry, ops: List[DecodeOp], button_ops: List[DecodeOp], kind: int):
+        """
+        Args:
+            status_index: Byte index of the status code, or None if there is no code mapping
+            status_table: Integer status code -> status fields
+            status_missing: Entry used when the status code is not in the table
+            ops: Operations for regular reports
+            button_ops: Operations for reports whose status puts the device in 'buttons' state
+            kind: Sample kind produced by this plan (SAMPLE_STYLUS or SAMPLE_BUTTONS)
+        """
+        self.status_index = status_index
+        self.status_table = status_table
+        self.status_missing = status_missing
+        self.ops = tuple(ops)
+        self.button_ops = tuple(button_ops)
+        self.kind = kind
+
+
+def _range_op(key: str, byte_index: int, min_val: int, max_val: int) -> DecodeOp:
+    """Compile a single-byte 'range' mapping"""
+    set_value = _SETTERS[key]
+    if max_val == min_val:
+        def op(data, sample):
+            set_value(sample, 0.0)
+    else:
+        scale = 1.0 / (max_val - min_val)
+        
+        def op(data, sample):
+            set_value(sample, (data[byte_index] - min_val) * scale)
+    return byte_index + 1, op
+
+
+def _multi_byte_range_op(key: str, byte_indices: List[int], min_val: int, max_val: int) -> DecodeOp:
+    """Compile a 'multi-byte-range' mapping (low byte first)"""
+    set_value = _SETTERS[key]
+    if not byte_indices:
+        def op(data, sample):
+            set_value(sample, 0.0)
+        return 0, op
+    
+    required_length = max(byte_indices) + 1
+    if max_val == min_val:
+        def op(data, sample):
+            set_value(sample, 0.0)
+        return required_length, op
+    
+    scale = 1.0 / (max_val - min_val)
+    first = byte_indices[0]
+    unpacker = _MULTI_BYTE_FORMATS.get(len(byte_indices))
+    is_contiguous = list(byte_indices) == list(range(first, first + len(byte_indices)))
+    
+    if unpacker is not None and is_contiguous:
+        unpack_from = unpacker.unpack_from
+        
+        def op(data, sample):
+            set_value(sample, (unpack_from(data, first)[0] - min_val) * scale)
+    else:
+        shifts = tuple((byte_idx, 8 * i) for i, byte_idx in enumerate(byte_indices))
+        
+        def op(data, sample):
+            value = 0
+            for byte_idx, shift in shifts:
+                value += data[byte_idx] << shift
+            set_value(sample, (value - min_val) * scale)
+    return required_length, op
+
+
+def _bipolar_range_op(key: str, byte_index: int, pos_min: int, pos_max: int, 
+                      neg_min: int, neg_max: int) -> DecodeOp:
+    """Compile a 'bipolar-range' mapping (same math as parse_bipolar_range_data)"""
+    set_value = _SETTERS[key]
+    pos_scale = 1.0 / (pos_max - pos_min) if pos_max != pos_min else 0.0
+    neg_scale = 1.0 / (neg_min - neg_max) if neg_min != neg_max else 0.0
+    
+    def op(data, sample):
+        value = data[byte_index]
+        if value < neg_max:
+            set_value(sample, value * pos_scale)
+        else:
+            set_value(sample, -(neg_min - value) * neg_scale)
+    return byte_index + 1, op
+
+
+def _bit_flags_op(byte_index: int, button_count: int) -> DecodeOp:
+    """Compile a 'bit-flags' mapping into a button bitmask"""
+    mask = (1 << button_count) - 1
+    
+    def op(data, sample):
+        sample.buttons = data[byte_index] & mask
+    return byte_index + 1, op
+
+
+def _button_code_op(byte_index: int, values: Dict[str, Any], button_count: int) -> DecodeOp:
+    """Compile a tabletButtons 'code' mapping into an integer-keyed table of button bitmasks"""
+    table: Dict[int, int] = {}
+    for code, value in values.items():
+        button_num = value.get('button') if isinstance(value, dict) else None
+        if button_num and code.isdigit() and button_num <= button_count:
+            # Only the matched button is pressed
+            table[int(code)] = 1 << (button_num - 1)
+    
+    def op(data, sample):
+        sample.buttons = table.get(data[byte_index], 0)
+    return byte_index + 1, op
+
+
+def _compile_status(mapping: Dict[str, Any]) -> Tuple[int, Dict[int, StatusEntry], StatusEntry]:
+    """Compile a status 'code' mapping into an integer-keyed lookup table"""
+    values = mapping.get('values', [])
+    table: Dict[int, StatusEntry] = {}
+    
+    if isinstance(values, dict):
+        items = [(int(code), value) for code, value in values.items() if code.isdigit()]
+    elif isinstance(values, list):
+        items = list(enumerate(values))
+    else:
+        items = []
+    
+    for code, value in items:
+        if isinstance(value, dict):
+            table[code] = (value.get('state'), bool(value.get('primaryButtonPressed', False)),
+                           bool(value.get('secondaryButtonPressed', False)))
+        else:
+            table[code] = (None, False, False)
+    
+    return mapping.get('byteIndex', 0), table, (None, False, False)
+
+
+def _compile_ops(mappings: Dict[str, Any], is_button_interface: bool, buttons_state: bool) -> List[DecodeOp]:
+    """
+    Compile the non-status mappings that apply to one kind of report.
+    
+    Args:
+        mappings: byteCodeMappings from the driver configuration
+        is_button_interface: Report comes from the button-only interface
+        buttons_state: Status code reported the 'buttons' state
+    """
+    button_mode = is_button_interface or buttons_state
+    ops: List[DecodeOp] = []
+    
+    for key, mapping in mappings.items():
+        mapping_type = mapping.get('type')
+        byte_index = mapping.get('byteIndex', 0)
+        
+        if mapping_type == 'code':
+            # Button codes are only read from the button interface, so stylus
+            # coordinate data can never produce false button presses
+            if key == 'tabletButtons' and is_button_interface:
+                ops.append(_button_code_op(byte_index, mapping.get('values', {}), mapping.get('buttonCount', 8)))
+            continue
+        
+        # Button flags only apply in button mode
+        if mapping_type == 'bit-flags':
+            if button_mode:
+                ops.append(_bit_flags_op(byte_index, mapping.get('buttonCount', 8)))
+            continue
+        
+        # Coordinate/pressure/tilt data is meaningless in button mode
+        if button_mode or key not in _SETTERS:
+            continue
+        
+        if mapping_type == 'range':
+            ops.append(_range_op(key, byte_index, mapping.get('min', 0), mapping.get('max', 0)))
+        elif mapping_type == 'multi-byte-range':
+            ops.append(_multi_byte_range_op(key, mapping.get('byteIndices', []), 
+                                            mapping.get('min', 0), mapping.get('max', 0)))
+        elif mapping_type == 'bipolar-range':
+            ops.append(_bipolar_range_op(
+                key,
+                byte_index,
+                mapping.get('positiveMin', 0),
+                mapping.get('positiveMax', 0),
+                mapping.get('negativeMin', 0),
+                mapping.get('negativeMax', 0)
+            ))
+    
+    return ops
+
+
+def is_no_contact(sample: TabletSample) -> bool:
+    """Check whether a sample is a stylus report with the pen off the tablet"""
+    if sample.kind != SAMPLE_STYLUS:
+        return False
+    if sample.state is None:
+        return sample.pressure == 0.0
+    return sample.state in NO_CONTACT_STATES
+
+
+def same_state(sample: TabletSample, other: TabletSample) -> bool:
+    """Check whether two samples have the same kind, contact, state and buttons"""
+    return (sample.kind == other.kind and is_no_contact(sample) == is_no_contact(other)
+            and sample.state == other.state and sample.buttons == other.buttons
+            and sample.primary_button == other.primary_button
+            and sample.secondary_button == other.secondary_button)
+
+
+def is_redundant(sample: TabletSample, following: TabletSample) -> bool:
+    """Check whether a no-contact sample can be dropped because the next one replaces it"""
+    return is_no_contact(sample) and same_state(sample, following)
+
+
+def coalesce_samples(samples: List[TabletSample]) -> List[TabletSample]:
+    """
+    Collapse runs of no-contact samples in a batch to the newest one.
+    
+    A no-contact sample is only dropped when the next sample is also no-contact
+    with the same state and buttons, so no transition is lost. Contact samples
+    and button reports are always kept, since any of them can move the
+    strummer to another string or change a button.
+    
+    Args:
+        samples: Decoded samples in read order
+        
+    Returns:
+        Samples to process, in read order
+    """
+    last = len(samples) - 1
+    kept = []
+    for i, sample in enumerate(samples):
+        if i < last and is_redundant(sample, samples[i + 1]):
+            continue
+        kept.append(sample)
+    return kept
+
+
+def compile_decode_plans(mappings: Dict[str, Any]) -> Tuple[DecodePlan, Dict[int, DecodePlan]]:
+    """
+    Compile byteCodeMappings into decode plans.
+    
+    Args:
+        mappings: byteCodeMappings from the driver configuration
+        
+    Returns:
+        Tuple of (default plan, {report_id: plan}) - reports whose ID is not in
+        the dictionary use the default plan
+    """
+    # The first 'code' mapping is the status byte
+    status_index, status_table, status_missing = None, {}, (None, False, False)
+    for key, mapping in mappings.items():
+        if mapping.get('type') == 'code':
+            status_index, status_table, status_missing = _compile_status(mapping)
+            break
+    
+    def build(is_button_interface: bool) -> DecodePlan:
+        return DecodePlan(
+            status_index,
+            status_table,
+            status_missing,
+            _compile_ops(mappings, is_button_interface, buttons_state=False),
+            _compile_ops(mappings, is_button_interface, buttons_state=True),
+            SAMPLE_BUTTONS if is_button_interface else SAMPLE_STYLUS
+        )
+    
+    return build(False), {BUTTON_REPORT_ID: build(True)}
 
 
 class HIDReader:
     """Manages HID device reading and data processing"""
     
-    def __init__(self, device, config: 'Config', data_callback: Callable[[Dict[str, Union[str, int, float]]], None], 
-                 warning_callback: Optional[Callable[[str], None]] = None):
+    def __init__(self, device, config: 'Config', data_callback: Callable[[TabletSample], None], 
+                 warning_callback: Optional[Callable[[str], None]] = None, interface_num: int = -1,
+                 capture: Optional['CaptureWriter'] = None):
         """
         Initialize HID reader
         
@@ -28,17 +367,40 @@ class HIDReader:
             config: Configuration instance with device byte code mappings
             data_callback: Callback function to handle processed data
             warning_callback: Optional callback function to send warnings (e.g., via websocket)
+            interface_num: Interface number of the device (recorded in captures)
+            capture: Optional capture writer that records every raw report
         """
         self.device = device
         self.config = config
         self.data_callback = data_callback
         self.warning_callback = warning_callback
+        self.interface_num = interface_num
+        self.capture = capture
         self.is_running = False
+        self._loop_exited = threading.Event()
+        self._loop_exited.set()  # No loop running yet
         # Use reportId from config, default to 2 if not specified
         self.expected_report_id = getattr(config, 'report_id', 2)
         self.wrong_report_id_warned = False  # Only warn once
         
-    def process_device_data(self, data: bytes) -> Dict[str, Union[str, int, float]]:
+        # Load shedding statistics
+        self.samples_read = 0
+        self.samples_dropped = 0
+        
+        # Byte code mappings compiled into per-report-ID decode plans
+        self._default_plan: DecodePlan
+        self._plans: Dict[int, DecodePlan]
+        self.compile_mappings()
+        
+    def compile_mappings(self) -> None:
+        """
+        Compile the configured byte code mappings into per-report-ID decode plans.
+        
+        Called on construction; call again if the driver's byteCodeMappings change.
+        """
+        self._default_plan, self._plans = compile_decode_plans(self.config.mappings)
+    
+    def process_device_data(self, data: bytes) -> TabletSample:
         """
         Process raw device data according to configuration byte code mappings
         
@@ -46,176 +408,233 @@ class HIDReader:
             data: Raw bytes from HID device
             
         Returns:
-            Dictionary with processed data values
-        """
-        # Convert bytes to list of integers
-        data_list = list(data)
-
-        result: Dict[str, Union[str, int, float]] = {}
-        
-        # Check Report ID - some interfaces (like button interface) don't use status codes
-        report_id = data_list[0] if len(data_list) > 0 else 0
-        is_button_interface = (report_id == 6)  # Report ID 6 is button-only interface on Linux
-        
-        # First, parse the status to determine device state (if using single-interface mode)
-        device_state = None
-        for key, mapping in self.config.mappings.items():
-            if mapping.get('type') == 'code':
-                byte_index = mapping.get('byteIndex', 0)
-                if byte_index < len(data_list):
-                    code_result = parse_code(data_list, byte_index, mapping.get('values', []))
-                    if isinstance(code_result, dict):
-                        result.update(code_result)
-                        device_state = code_result.get('state')
-                    else:
-                        result[key] = code_result
-                    break
+            Decoded tablet sample
+        """
+        if isinstance(data, list):
+            data = bytes(data)
         
-        # Process remaining mappings based on device state
-        for key, mapping in self.config.mappings.items():
-            mapping_type = mapping.get('type')
-            byte_index = mapping.get('byteIndex', 0)
-            
-            # Skip if already processed (status/code), unless it's tabletButtons with code type
-            if mapping_type == 'code' and key != 'tabletButtons':
-                continue
-            
-            # Handle tabletButtons with code type (custom value mapping)
-            if key == 'tabletButtons' and mapping_type == 'code':
-                # ONLY process button codes from the button interface (Report ID 6)
-                # This prevents false button detections from stylus coordinate data
-                if is_button_interface:
-                    if byte_index < len(data_list):
-                        byte_value = str(data_list[byte_index])
-                        values_map = mapping.get('values', {})
-                        if byte_value in values_map:
-                            button_num = values_map[byte_value].get('button')
-                            if button_num:
-                                # Set only this button as pressed
-                                button_count = mapping.get('buttonCount', 8)
-                                for i in range(1, button_count + 1):
-                                    result[f'button{i}'] = (i == button_num)
-                continue
-            
-            # Skip button parsing if not in button mode (unless we're on button-only interface)
-            if mapping_type == 'bit-flags' and device_state != 'buttons' and not is_button_interface:
-                continue
-            
-            # Skip coordinate/pressure/tilt parsing if on button-only interface or in button mode
-            if (is_button_interface or device_state == 'buttons') and key in ['x', 'y', 'pressure', 'tiltX', 'tiltY']:
-                continue
-            
-            # Skip validation for multi-byte-range as it uses byteIndices instead
-            if mapping_type != 'multi-byte-range' and byte_index >= len(data_list):
-                continue
-                
-            if mapping_type == 'range':
-                result[key] = parse_range_data(
-                    data_list, 
-                    byte_index, 
-                    mapping.get('min', 0), 
-                    mapping.get('max', 0)
-                )
-            elif mapping_type == 'multi-byte-range':
-                byte_indices = mapping.get('byteIndices', [])
-                # Validate all indices are within bounds
-                if all(idx < len(data_list) for idx in byte_indices):
-                    result[key] = parse_multi_byte_range_data(
-                        data_list,
-                        byte_indices,
-                        mapping.get('min', 0),
-                        mapping.get('max', 0),
-                        debug_name=key  # Pass the key name for debug logging
-                    )
-            elif mapping_type == 'bipolar-range':
-                result[key] = parse_bipolar_range_data(
-                    data_list,
-                    byte_index,
-                    mapping.get('positiveMin', 0),
-                    mapping.get('positiveMax', 0),
-                    mapping.get('negativeMin', 0),
-                    mapping.get('negativeMax', 0)
-                )
-            elif mapping_type == 'bit-flags':
-                button_states = parse_bit_flags(
-                    data_list,
-                    byte_index,
-                    mapping.get('buttonCount', 8)
-                )
-                result.update(button_states)
-        
-        return result
-    
-    def start_reading(self, buffer_size: int = 64, sleep_interval: float = 0.001):
+        length = len(data)
+        report_id = data[0] if length > 0 else 0
+        
+        # Report ID 6 is the button-only interface on Linux
+        plan = self._plans.get(report_id, self._default_plan)
+        sample = TabletSample(report_id, plan.kind)
+        sample.interface = self.interface_num
+        
+        # Status byte first - its state decides which operations apply
+        ops = plan.ops
+        if plan.status_index is not None and plan.status_index < length:
+            state, sample.primary_button, sample.secondary_button = plan.status_table.get(
+                data[plan.status_index], plan.status_missing)
+            sample.state = state
+            if state == 'buttons':
+                ops = plan.button_ops
+                sample.kind = SAMPLE_BUTTONS
+        
+        for required_length, op in ops:
+            if length >= required_length:
+                op(data, sample)
+        
+        return sample
+    
+    def start_reading(self, buffer_size: int = 64, read_timeout_ms: int = 100, sleep_interval: float = 0.001):
         """
         Start reading from the HID device in a loop
         
+        Reads block for up to read_timeout_ms, so the thread sleeps in the kernel
+        while the pen is idle and wakes as soon as a report arrives. The timeout
+        bounds how long stop() takes to be noticed. If the HID library does not
+        support timed reads, falls back to non-blocking polling.
+        
+        Each wake-up drains every report already queued, so if processing falls
+        behind the backlog is handled as one batch and redundant hover reports
+        are skipped (see coalesce_samples).
+        
         Args:
             buffer_size: Size of read buffer in bytes
-            sleep_interval: Sleep time between reads when no data (seconds)
+            read_timeout_ms: Maximum time a single read blocks waiting for data (milliseconds)
+            sleep_interval: Sleep time between reads when no data, polling fallback only (seconds)
         """
         if not self.device:
             raise ValueError("No device available for reading")
         
         self.is_running = True
-        
-        # Use non-blocking mode to allow signal handling
-        self.device.set_nonblocking(True)
-        read_count = 0
-        empty_read_count = 0
+        self._loop_exited.clear()
 
-        print("[HID] Starting device reading loop...")
+        try:
+            # Non-blocking mode throughout: untimed reads return at once (so polling and
+            # draining never wait), while read(size, timeout_ms) still waits up to its timeout
+            self.device.set_nonblocking(True)
+            use_timed_reads = self._enable_timed_reads(buffer_size, read_timeout_ms)
 
-        while self.is_running:
-            try:
-                # Read data from device (non-blocking)
-                data = self.device.read(buffer_size)
-                read_count += 1
-
-                if data:
-                    empty_read_count = 0  # Reset empty count
-                    
-                    # Log Report ID for debugging (different interfaces may use different IDs)
-                    # On multi-interface devices, buttons and stylus may have different report IDs
-                    report_id = data[0] if len(data) > 0 else 0
-                    if len(data) > 0 and not self.wrong_report_id_warned:
-                        if report_id != self.expected_report_id:
-                            print(f"[HID] Note: Interface using Report ID {report_id} (config specifies {self.expected_report_id})")
-                            self.wrong_report_id_warned = True
-                    
-                    # Process the data
-                    processed_data = self.process_device_data(bytes(data))
-                    
-                    # Call the callback with processed data
-                    if self.data_callback:
-                        self.data_callback(processed_data)
-                else:
-                    empty_read_count += 1
-                    # Small sleep to prevent CPU spinning
-                    time.sleep(sleep_interval)
-
-            except OSError as e:
-                # Handle device disconnection
-                if "read error" in str(e).lower() or "device" in str(e).lower():
-                    print(f"[HID] Device disconnected or error: {e}")
-                    self.is_running = False
-                    break
-                print(f"[HID] Error reading from device: {e}")
-                time.sleep(0.1)
-            except Exception as e:
-                print(f"[HID] Unexpected error: {e}")
-                time.sleep(0.1)
+            print(f"[HID] Starting device reading loop ({'timed' if use_timed_reads else 'polling'} reads)...")
+
+            while self.is_running:
+                try:
+                    if use_timed_reads:
+                        # Blocks until a report arrives or the timeout expires
+                        data = self.device.read(buffer_size, read_timeout_ms)
+                    else:
+                        data = self.device.read(buffer_size)
+
+                    if data:
+                        self.handle_samples(self._drain(data, buffer_size))
+                    elif not use_timed_reads:
+                        # Small sleep to prevent CPU spinning
+                        time.sleep(sleep_interval)
+
+                except OSError as e:
+                    # Handle device disconnection
+                    if "read error" in str(e).lower() or "device" in str(e).lower():
+                        print(f"[HID] Device disconnected or error: {e}")
+                        self.is_running = False
+                        break
+                    print(f"[HID] Error reading from device: {e}")
+                    time.sleep(0.1)
+                except Exception as e:
+                    print(f"[HID] Unexpected error: {e}")
+                    time.sleep(0.1)
+        finally:
+            self._loop_exited.set()
         
+        if self.samples_dropped:
+            print(f"[HID] Skipped {self.samples_dropped} of {self.samples_read} reports while catching up")
         print("[HID] Device reading loop stopped")
     
+    def _drain(self, data, buffer_size: int) -> List[TabletSample]:
+        """
+        Decode a report and every report already queued behind it
+        
+        Args:
+            data: Report returned by the waiting read
+            buffer_size: Size of read buffer in bytes
+            
+        Returns:
+            Decoded samples in read order
+        """
+        samples = [self.decode_report(data, time.monotonic_ns())]
+        # The device is non-blocking, so an untimed read returns nothing once the queue is empty
+        while len(samples) < MAX_BATCH_SIZE:
+            data = self.device.read(buffer_size)
+            if not data:
+                break
+            samples.append(self.decode_report(data, time.monotonic_ns()))
+        return samples
+    
+    def _enable_timed_reads(self, buffer_size: int, read_timeout_ms: int) -> bool:
+        """
+        Check that read(size, timeout_ms) is supported. The device must already be in
+        non-blocking mode; a timed read waits up to its timeout in either mode.
+        
+        Returns:
+            True if timed reads can be used, False to fall back to polling
+        """
+        if read_timeout_ms <= 0:
+            return False
+        try:
+            # Probe with a 1 ms timeout: a zero timeout means an untimed read.
+            # Any report read here is processed normally
+            data = self.device.read(buffer_size, 1)
+        except TypeError:
+            print("[HID] Timed reads not supported by HID library, using polling")
+            return False
+        if data:
+            self.handle_report(data, time.monotonic_ns())
+        return True
+    
+    def handle_report(self, data, timestamp_ns: Optional[int] = None, received_ns: Optional[int] = None) -> None:
+        """
+        Decode one raw report and pass it to the data callback
+        
+        Args:
+            data: Raw report as a list of ints or any bytes-like object
+            timestamp_ns: time.monotonic_ns() taken when the read returned (defaults to now)
+            received_ns: time.monotonic_ns() the report was handed over (defaults to timestamp_ns)
+        """
+        sample = self.decode_report(data, timestamp_ns, received_ns)
+        self.samples_read += 1
+        if self.data_callback:
+            self.data_callback(sample)
+    
+    def handle_samples(self, samples: List[TabletSample]) -> None:
+        """
+        Pass a batch of samples read in one wake-up to the data callback,
+        skipping redundant hover samples
+        
+        Args:
+            samples: Decoded samples in read order
+        """
+        self.samples_read += len(samples)
+        if len(samples) > 1:
+            kept = coalesce_samples(samples)
+            self.samples_dropped += len(samples) - len(kept)
+            samples = kept
+        
+        if self.data_callback:
+            for sample in samples:
+                self.data_callback(sample)
+    
+    def decode_report(self, data, timestamp_ns: Optional[int] = None,
+                      received_ns: Optional[int] = None) -> TabletSample:
+        """
+        Decode one raw report, recording it to the capture file if enabled
+        
+        The timestamp is stored in the sample's timestamp_ns so that
+        everything downstream measures time from when the report was read,
+        not from when it was processed.
+        
+        Args:
+            data: Raw report as a list of ints or any bytes-like object
+            timestamp_ns: time.monotonic_ns() taken when the read returned (defaults to now)
+            received_ns: time.monotonic_ns() the report was handed over (defaults to timestamp_ns);
+                a replay passes the recorded timing as timestamp_ns and the real time here
+            
+        Returns:
+            Decoded tablet sample
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        
+        # Log Report ID for debugging (different interfaces may use different IDs)
+        # On multi-interface devices, buttons and stylus may have different report IDs
+        if len(data) > 0 and not self.wrong_report_id_warned:
+            report_id = data[0]
+            if report_id != self.expected_report_id:
+                print(f"[HID] Note: Interface using Report ID {report_id} (config specifies {self.expected_report_id})")
+                self.wrong_report_id_warned = True
+        
+        if self.capture is not None:
+            self.capture.write(self.interface_num, data, timestamp_ns)
+        
+        # Process the data
+        sample = self.process_device_data(data)
+        sample.timestamp_ns = timestamp_ns
+        sample.received_ns = received_ns if received_ns is not None else timestamp_ns
+        return sample
+    
     def stop(self):
         """Stop the reading loop"""
         print("[HID] Stopping HID reader...")
         self.is_running = False
     
+    def wait_stopped(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the reading loop to exit after stop().
+        
+        Args:
+            timeout: Maximum time to wait (seconds), or None to wait indefinitely
+            
+        Returns:
+            True if the loop is not running
+        """
+        return self._loop_exited.wait(timeout)
+    
     def close(self):
         """Close the HID device"""
         if self.device:
+            # Never close the handle while the reading thread is inside a blocking read
+            if not self.wait_stopped(timeout=1.0):
+                print("[HID] Warning: reading loop still active while closing device")
             try:
                 print("[HID] Closing HID device...")
                 # Try to ensure the device is in a good state before closing
@@ -1,14 +1,66 @@
-import time
+import os
+import struct
 import threading
-import queue
-from typing import List, Optional, Tuple
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 try:
     import jack
 except ImportError:
     jack = None
 from note import Note, NoteObject
-from midievent import MidiConnectionEvent, MidiNoteEvent, NOTE_EVENT, CONNECTION_EVENT
+from midievent import (MidiConnectionEvent, MidiNoteEvent, NOTE_EVENT, CONNECTION_EVENT, MIDI_NOTE_NAMES,
+                       held_note_numbers)
 from eventlistener import EventEmitter
+from midimessages import (MessageBatch, CONTROL_CHANGE, NOTE_OFF, NOTE_OFF_VELOCITY, PITCH_BEND, channel_mask,
+                          is_note_release, note_on_batch, note_off_batch, pitch_bend_batch)
+
+
+# Output ringbuffer record: kind, JACK frame time it was queued at, note-off due frame, 3-byte message
+_OUT_RECORD = struct.Struct('<BII3s')
+
+# Record kinds
+_SEND = 0               # Write the message
+_SCHEDULE_NOTE_OFF = 1  # Set the pending note-off for the message's channel/note to the due frame
+_CANCEL_NOTE_OFF = 2    # Clear the pending note-off for the message's channel/note
+
+# Output ringbuffer size in bytes (a power of two; holds over 5000 records)
+OUT_RINGBUFFER_SIZE = 65536
+
+# Ringbuffer space only note releases may use, so a burst of note-ons cannot crowd them out
+_RELEASE_RESERVE = OUT_RINGBUFFER_SIZE // 4
+
+# Input ringbuffer record: the 3-byte message only. Its arrival frame is not copied:
+# note events are not timed, so the callback writes no more than the worker uses
+_IN_RECORD_SIZE = 3
+
+# Input ringbuffer size in bytes (a power of two; holds over 5000 events)
+IN_RINGBUFFER_SIZE = 16384
+
+# Pending note-off table size, one slot per channel * 128 + note
+_NOTE_OFF_SLOTS = 16 * 128
+
+# Coalesced controller table size, one slot per channel * 129 + controller (128 is pitch bend)
+_CONTROLLER_SLOTS = 16 * 129
+
+# Most timed events due in one cycle: every note-off slot and every controller slot
+_DUE_SLOTS = _NOTE_OFF_SLOTS + _CONTROLLER_SLOTS
+
+
+def _frame_delta(frame: int, reference: int) -> int:
+    """Signed difference between two JACK frame times, which are 32-bit and wrap around"""
+    delta = (frame - reference) & 0xFFFFFFFF
+    return delta - 0x100000000 if delta >= 0x80000000 else delta
+
+
+def _note_off_slot(message: bytes) -> int:
+    """Pending note-off table slot for a note message (channel * 128 + note)"""
+    return ((message[0] & 0x0F) << 7) | message[1]
+
+
+def _controller_slot(message: bytes) -> int:
+    """Coalesced controller table slot for a control change or pitch bend message"""
+    controller = 128 if message[0] & 0xF0 == PITCH_BEND else message[1]
+    return (message[0] & 0x0F) * 129 + controller
 
 
 """
@@ -20,7 +72,29 @@ class JackMidi(EventEmitter):
     Outputs MIDI through Jack Audio Connection Kit for integration with Zynthian and other Jack-based systems.
     
     IMPORTANT: Jack MIDI events must be sent from within the process callback for real-time performance.
-    This implementation uses a queue to pass events from Python threads to the Jack process callback.
+    Python threads write events into a jack.RingBuffer, stamped with the current JACK frame time.
+    The process callback reads them without taking any lock and writes each one a fixed one
+    period after the frame it was queued at, so event spacing is sample accurate instead of
+    being quantised to the period size.
+    
+    Note-offs are scheduled in JACK frame time too: the process callback keeps a
+    preallocated table of pending note-off frames, one slot per channel and note, and
+    writes each note-off in the cycle (and at the offset) where it falls due. Producers
+    never touch the table directly; they queue schedule/cancel records in the same
+    ringbuffer, so the table has a single writer and retrigger/release stay in order
+    with the notes they apply to.
+    
+    Incoming MIDI goes the other way: the process callback only copies events into
+    an input ringbuffer and wakes a normal-priority worker thread through a self-pipe.
+    The worker decodes them and updates the held notes, so NOTE_EVENT listeners never
+    run on the JACK thread.
+    
+    Output has three priority classes so overload never leaves a note stuck:
+    note releases (note-off, all notes/sound off) are never dropped - a reserve of
+    ringbuffer space is kept for them, and if even that is full they wait in an
+    overflow queue; note-ons are dropped when the ringbuffer is short of space;
+    pitch bend and control changes are coalesced to the latest value per
+    channel and controller.
     """
     
     def __init__(self, midi_strum_channel: Optional[int] = None, client_name: str = "midi_strummer"):
@@ -34,22 +108,63 @@ class JackMidi(EventEmitter):
         
         self.client_name = client_name
         self._midi_strum_channel: Optional[int] = midi_strum_channel
-        self._notes: List[str] = []
-        self._active_note_timers: dict = {}  # Track active note-off timers
-        self._timer_lock = threading.Lock()
-        self._note_start_times: dict = {}  # Track when each note started
+        self._channel_mask: int = channel_mask(midi_strum_channel)  # Channels notes are sent on
+        self._held_notes: int = 0  # Bit n set while input MIDI note n is held
         
         # Jack client and ports
         self.jack_client: Optional[jack.Client] = None
         self.midi_out_port: Optional[jack.MidiPort] = None
         self.midi_in_port: Optional[jack.MidiPort] = None
         
-        # MIDI event queue for real-time processing
-        # Queue items are tuples: (timestamp_offset, midi_message_bytes)
-        self._midi_queue: queue.Queue = queue.Queue(maxsize=1000)
+        # Lock-free single-reader ringbuffer feeding the process callback; the lock only
+        # serializes producer threads (engine, note-off scheduler) against each other
+        self._out_ring = jack.RingBuffer(OUT_RINGBUFFER_SIZE)
+        self._out_write_lock = threading.Lock()
+        
+        # Pending note-offs, only touched by the process callback: due frame per slot, or None
+        self._note_off_frames: List[Optional[int]] = [None] * _NOTE_OFF_SLOTS
+        self._note_off_count: int = 0  # Slots with a pending note-off
+        self._next_note_off_frame: int = 0  # No pending note-off is due before this frame
+        self._note_off_messages: Tuple[bytes, ...] = tuple(
+            bytes((NOTE_OFF | (slot >> 7), slot & 0x7F, NOTE_OFF_VELOCITY)) for slot in range(_NOTE_OFF_SLOTS)
+        )
+        self._cycle_offset: int = 0  # Offset of the last event written this cycle
+        
+        # Note-offs and controller values due in the current cycle, earliest first, as
+        # preallocated parallel arrays so the process callback never builds or sorts a list
+        self._due_deltas: List[int] = [0] * _DUE_SLOTS  # Frames before cycle start
+        self._due_kinds: List[int] = [0] * _DUE_SLOTS  # _SCHEDULE_NOTE_OFF or _SEND
+        self._due_slots: List[int] = [0] * _DUE_SLOTS
+        self._due_values: List[Any] = [None] * _DUE_SLOTS  # Due frame (note-off) or message (controller)
+        self._due_count: int = 0
+        
+        # Note releases that did not fit in the ringbuffer, read by the process callback once
+        # the ringbuffer is empty. While it is not empty nothing else enters the ringbuffer.
+        self._overflow: Deque[bytes] = deque()
+        self._overflow_position: int = 0  # Next record in _overflow[0] (callback only)
+        
+        # Latest pitch bend/control change value per slot as (frame, message); a slot is queued
+        # in _dirty_controllers once until the callback sends it
+        self._controller_values: List[Optional[Tuple[int, bytes]]] = [None] * _CONTROLLER_SLOTS
+        self._controller_dirty: List[bool] = [False] * _CONTROLLER_SLOTS
+        self._dirty_controllers: Deque[int] = deque()
+        
+        # Incoming MIDI, copied by the process callback and handled on the input worker thread.
+        # The worker blocks reading the self-pipe; the callback writes a byte without blocking.
+        self._in_ring = jack.RingBuffer(IN_RINGBUFFER_SIZE)
+        self._in_wake_read, self._in_wake_write = os.pipe()
+        os.set_blocking(self._in_wake_write, False)
+        self._input_thread: Optional[threading.Thread] = None
+        self._input_running: bool = False
+        self._input_dropped_count: int = 0
         
         # Debug tracking
         self._events_sent_count: int = 0
+        self._note_ons_dropped: int = 0
+        self._dropping_note_ons: bool = False  # Warn once per overload, not per note
+        self._releases_deferred: int = 0
+        self._controllers_coalesced: int = 0
+        self._late_events_count: int = 0
         self._last_callback_error: Optional[str] = None
         
         # MIDI input callback support
@@ -62,8 +177,8 @@ class JackMidi(EventEmitter):
     
     @property
     def notes(self) -> List[str]:
-        """Get current notes"""
-        return self._notes
+        """Get current notes, lowest first"""
+        return [MIDI_NOTE_NAMES[n] for n in held_note_numbers(self._held_notes)]
     
     def refresh_connection(self, midi_input_id: Optional[str] = None) -> None:
         """Initialize Jack MIDI connections"""
@@ -79,6 +194,7 @@ class JackMidi(EventEmitter):
             
             # Set up process callback for handling incoming MIDI
             self.jack_client.set_process_callback(self._process_callback)
+            self._start_input_worker()
             
             # Activate the client
             self.jack_client.activate()
@@ -125,39 +241,244 @@ class JackMidi(EventEmitter):
         """
         # Clear the output port buffer
         self.midi_out_port.clear_buffer()
-        
-        # Send all queued MIDI events
-        events_sent = 0
-        while not self._midi_queue.empty():
+        self._cycle_offset = 0
+        
+        # Everything is played one period after the frame it was queued (or fell due) at,
+        # so an event at frame F is written at offset F - cycle_start + frames. Records
+        # queued before this cycle started are handled now; later ones wait.
+        ring = self._out_ring
+        record_size = _OUT_RECORD.size
+        cycle_start = self.jack_client.last_frame_time
+        self._collect_timed_events(cycle_start)
+        next_timed = 0
+        
+        while ring.read_space >= record_size:
+            record = _OUT_RECORD.unpack(ring.peek(record_size))
+            delta = _frame_delta(record[1], cycle_start)
+            if delta >= 0:
+                break  # Belongs to a later cycle; records are queued in frame order
+            next_timed = self._write_timed_events(next_timed, delta, frames)
+            ring.read_advance(record_size)
+            self._handle_record(record, delta, frames)
+        else:
+            # The ringbuffer is empty: note releases that did not fit in it come next
+            overflow = self._overflow
+            while overflow:
+                records = overflow[0]
+                record = _OUT_RECORD.unpack_from(records, self._overflow_position)
+                delta = _frame_delta(record[1], cycle_start)
+                if delta >= 0:
+                    break
+                next_timed = self._write_timed_events(next_timed, delta, frames)
+                self._handle_record(record, delta, frames)
+                self._overflow_position += record_size
+                if self._overflow_position >= len(records):
+                    overflow.popleft()
+                    self._overflow_position = 0
+        
+        self._write_timed_events(next_timed, 0, frames)
+        
+        # Copy incoming MIDI for the input worker; decoding and note events happen there
+        in_ring = self._in_ring
+        received = False
+        for _, data in self.midi_in_port.incoming_midi_events():
+            if len(data) >= 3:
+                if in_ring.write_space < _IN_RECORD_SIZE:
+                    self._input_dropped_count += 1
+                    continue
+                in_ring.write(data[:_IN_RECORD_SIZE])
+                received = True
+        if received:
+            try:
+                os.write(self._in_wake_write, b'\0')
+            except OSError:
+                pass  # Pipe full: the worker is already due to wake up
+    
+    def _start_input_worker(self) -> None:
+        """Start the thread that handles incoming MIDI"""
+        if self._input_running:
+            return
+        self._input_running = True
+        self._input_thread = threading.Thread(target=self._run_input_worker, name='JackMidiInput', daemon=True)
+        self._input_thread.start()
+    
+    def _stop_input_worker(self, timeout: float = 1.0) -> None:
+        """Stop the input worker thread"""
+        if not self._input_running:
+            return
+        self._input_running = False
+        try:
+            os.write(self._in_wake_write, b'\0')
+        except OSError:
+            pass
+        if self._input_thread is not None:
+            self._input_thread.join(timeout)
+        self._input_thread = None
+    
+    def _run_input_worker(self) -> None:
+        """Input worker thread: wait for the process callback and handle the events it copied"""
+        in_ring = self._in_ring
+        record_size = _IN_RECORD_SIZE
+        while True:
             try:
-                offset, midi_message = self._midi_queue.get_nowait()
-                self.midi_out_port.write_midi_event(offset, midi_message)
-                events_sent += 1
-            except queue.Empty:
+                os.read(self._in_wake_read, 64)
+            except OSError:
                 break
-            except Exception as e:
-                # Store exception for later (can't print in callback)
-                self._last_callback_error = str(e)
+            
+            while in_ring.read_space >= record_size:
+                data = in_ring.read(record_size)
+                try:
+                    self._handle_input_message(data)
+                except Exception as e:
+                    print(f"[Jack MIDI] Error handling MIDI input: {e}")
+            
+            if not self._input_running:
+                break
+    
+    def _handle_input_message(self, data: bytes) -> None:
+        """
+        Handle an incoming MIDI message (called on the input worker thread)
         
-        # Debug: track if we're sending events
-        if events_sent > 0:
-            self._events_sent_count = getattr(self, '_events_sent_count', 0) + events_sent
+        Args:
+            data: 3-byte MIDI message
+        """
+        command, note, velocity = data[0], data[1], data[2]
+        
+        if command == 0x90:  # Note on message
+            if velocity > 0:
+                self._press_note(note)
+            else:
+                self._release_note(note)
+        elif command == 0x80:  # Note off message
+            self._release_note(note)
+    
+    def _handle_record(self, record: Tuple[int, int, int, bytes], delta: int, frames: int) -> None:
+        """Apply an output record that is due in this cycle (called from the process callback)"""
+        kind, _, due_frame, message = record
+        if kind == _SEND:
+            self._write_event(delta + frames, message)
+        elif kind == _SCHEDULE_NOTE_OFF:
+            # Replaces any pending note-off for this channel/note (retrigger)
+            slot = _note_off_slot(message)
+            if self._note_off_frames[slot] is None:
+                self._note_off_count += 1
+            self._note_off_frames[slot] = due_frame
+            if self._note_off_count == 1 or _frame_delta(due_frame, self._next_note_off_frame) < 0:
+                self._next_note_off_frame = due_frame
+        else:
+            # _next_note_off_frame may now be early; that only costs one extra scan
+            slot = _note_off_slot(message)
+            if self._note_off_frames[slot] is not None:
+                self._note_off_frames[slot] = None
+                self._note_off_count -= 1
+    
+    def _collect_timed_events(self, cycle_start: int) -> None:
+        """
+        Fill the due arrays with the pending note-offs and coalesced controller values that
+        are due in this cycle, earliest first (called from the process callback)
         
-        # Process incoming MIDI events
-        for offset, data in self.midi_in_port.incoming_midi_events():
-            if len(data) >= 3:
-                command, note, velocity = data[0], data[1], data[2]
-                notation_list = [*Note.sharp_notations, *Note.sharp_notations]
-                notation = notation_list[note % len(Note.sharp_notations)]
-                octave = note // len(Note.sharp_notations) - 1
-                
-                if command == 0x90:  # Note on message
-                    if velocity > 0:
-                        self.on_note_down(notation, octave)
-                    else:
-                        self.on_note_up(notation, octave)
-                elif command == 0x80:  # Note off message
-                    self.on_note_up(notation, octave)
+        The note-off table is only scanned in cycles where _next_note_off_frame says a
+        note-off may be due; the scan also finds the next due frame.
+        """
+        count = 0
+        if self._note_off_count and _frame_delta(self._next_note_off_frame, cycle_start) < 0:
+            note_off_frames = self._note_off_frames
+            next_frame = None
+            next_delta = 0
+            for slot in range(_NOTE_OFF_SLOTS):
+                frame = note_off_frames[slot]
+                if frame is None:
+                    continue
+                delta = _frame_delta(frame, cycle_start)
+                if delta < 0:
+                    count = self._insert_due(count, delta, _SCHEDULE_NOTE_OFF, slot, frame)
+                elif next_frame is None or delta < next_delta:
+                    next_frame = frame
+                    next_delta = delta
+            if next_frame is not None:
+                self._next_note_off_frame = next_frame
+        
+        dirty = self._dirty_controllers
+        while dirty:
+            slot = dirty[0]
+            frame, _ = self._controller_values[slot]
+            delta = _frame_delta(frame, cycle_start)
+            if delta >= 0:
+                break
+            dirty.popleft()
+            # Clear the flag before reading the value: a value set after this is queued again
+            self._controller_dirty[slot] = False
+            _, message = self._controller_values[slot]
+            count = self._insert_due(count, delta, _SEND, slot, message)
+        
+        self._due_count = count
+    
+    def _insert_due(self, count: int, delta: int, kind: int, slot: int, value: Any) -> int:
+        """
+        Insert a due event into the due arrays, keeping them ordered by delta
+        (called from the process callback; only a few events fall due per cycle)
+        
+        Returns:
+            New number of due events
+        """
+        deltas = self._due_deltas
+        kinds = self._due_kinds
+        slots = self._due_slots
+        values = self._due_values
+        index = count
+        while index > 0 and deltas[index - 1] > delta:
+            deltas[index] = deltas[index - 1]
+            kinds[index] = kinds[index - 1]
+            slots[index] = slots[index - 1]
+            values[index] = values[index - 1]
+            index -= 1
+        deltas[index] = delta
+        kinds[index] = kind
+        slots[index] = slot
+        values[index] = value
+        return count + 1
+    
+    def _write_timed_events(self, index: int, delta: int, frames: int) -> int:
+        """
+        Write the due events that fall before a record (called from the process callback)
+        
+        Args:
+            index: First due event not written yet
+            delta: Frames before cycle start of the record about to be handled
+            frames: Period size
+        
+        Returns:
+            Index of the first due event not written yet
+        """
+        count = self._due_count
+        deltas = self._due_deltas
+        while index < count and deltas[index] <= delta:
+            slot = self._due_slots[index]
+            value = self._due_values[index]
+            self._due_values[index] = None  # Do not keep messages alive until the slot is reused
+            if self._due_kinds[index] == _SEND:
+                self._write_event(deltas[index] + frames, value)
+            elif self._note_off_frames[slot] == value:
+                # Still pending: not cancelled or rescheduled earlier in this cycle
+                self._note_off_frames[slot] = None
+                self._note_off_count -= 1
+                self._write_event(deltas[index] + frames, self._note_off_messages[slot])
+            index += 1
+        return index
+    
+    def _write_event(self, offset: int, message: bytes) -> None:
+        """Write a MIDI event to the output port (called from the process callback)"""
+        if offset < self._cycle_offset:
+            # Late (or before the previous event's slot); events must not go back in time
+            offset = self._cycle_offset
+            self._late_events_count += 1
+        try:
+            self.midi_out_port.write_midi_event(offset, message)
+            self._events_sent_count += 1
+            self._cycle_offset = offset
+        except Exception as e:
+            # Store exception for later (can't print in callback)
+            self._last_callback_error = str(e)
     
     def _auto_connect_to_synths(self, mode: str = "chain0") -> None:
         """
@@ -239,15 +560,86 @@ class JackMidi(EventEmitter):
         except Exception as e:
             print(f"[Jack MIDI] Auto-connect error: {e}")
     
-    def _queue_midi_event(self, midi_message: bytes, offset: int = 0) -> None:
+    def _queue_midi_batch(self, messages: MessageBatch) -> None:
         """
-        Queue a MIDI event to be sent in the next process callback.
+        Queue pre-encoded MIDI messages to be sent by the process callback.
         This is thread-safe and can be called from any thread.
+        
+        The batch is handled by the priority class of its messages: note releases
+        are never dropped, pitch bend/control changes are coalesced and anything
+        else may be dropped when the ringbuffer is short of space.
         """
-        try:
-            self._midi_queue.put_nowait((offset, midi_message))
-        except queue.Full:
-            print("[Jack MIDI] Warning: MIDI queue full, dropping event")
+        if not messages or self.jack_client is None:
+            return
+        status = messages[0][0] & 0xF0
+        if status == PITCH_BEND or (status == CONTROL_CHANGE and not is_note_release(messages[0])):
+            self._set_controllers(messages)
+            return
+        pack = _OUT_RECORD.pack
+        self._write_records(lambda frame: b''.join(pack(_SEND, frame, 0, message) for message in messages),
+                            len(messages), release=is_note_release(messages[0]))
+    
+    def _set_controllers(self, messages: MessageBatch) -> None:
+        """Replace the pending value of pitch bend/control change messages"""
+        values = self._controller_values
+        dirty = self._controller_dirty
+        with self._out_write_lock:
+            # Read under the lock so slots enter _dirty_controllers in frame order
+            frame = self.jack_client.frame_time
+            for message in messages:
+                slot = _controller_slot(message)
+                # Set the value before checking the flag; see _collect_timed_events()
+                values[slot] = (frame, message)
+                if dirty[slot]:
+                    self._controllers_coalesced += 1
+                else:
+                    dirty[slot] = True
+                    self._dirty_controllers.append(slot)
+    
+    def _write_records(self, build_records: Callable[[int], bytes], count: int, release: bool = False) -> None:
+        """
+        Write packed records to the output ringbuffer in one write, so they are never
+        split across cycles or dropped halfway
+        
+        Args:
+            build_records: Packs the _OUT_RECORD records for the JACK frame time it is given.
+                     It is called under the write lock with the current frame time, so records
+                     from different threads enter the ringbuffer in frame order.
+            count: Number of messages, for the statistics
+            release: True for note releases, which are never dropped. Other records
+                     are dropped if they would cut into the space reserved for releases.
+        """
+        with self._out_write_lock:
+            records = build_records(self.jack_client.frame_time)
+            if release:
+                if self._overflow or self._out_ring.write_space < len(records):
+                    # Keep it for the process callback to read once the ringbuffer is empty
+                    self._overflow.append(records)
+                    self._releases_deferred += count
+                    return
+            elif self._overflow or self._out_ring.write_space - _RELEASE_RESERVE < len(records):
+                self._note_ons_dropped += count
+                if not self._dropping_note_ons:
+                    self._dropping_note_ons = True
+                    print("[Jack MIDI] Warning: MIDI ringbuffer full, dropping note-ons")
+                return
+            else:
+                self._dropping_note_ons = False
+            self._out_ring.write(records)
+    
+    def get_output_stats(self) -> Dict[str, Any]:
+        """Get MIDI output ringbuffer statistics"""
+        return {
+            'pendingBytes': self._out_ring.read_space,
+            'eventsSent': self._events_sent_count,
+            'noteOnsDropped': self._note_ons_dropped,
+            'releasesDeferred': self._releases_deferred,
+            'controllersCoalesced': self._controllers_coalesced,
+            'overflowDepth': len(self._overflow),
+            'lateEvents': self._late_events_count,
+            'pendingNoteOffs': self._note_off_count,
+            'inputDropped': self._input_dropped_count
+        }
     
     def send_pitch_bend(self, bend_value: float) -> None:
         """
@@ -266,103 +658,37 @@ class JackMidi(EventEmitter):
         midi_bend = int((bend_value + 1.0) * 8192)
         midi_bend = max(0, min(16383, midi_bend))
         
-        # Split into LSB and MSB (7 bits each)
-        lsb = midi_bend & 0x7F
-        msb = (midi_bend >> 7) & 0x7F
-        
-        # Determine which channels to send on
-        if self._midi_strum_channel is not None:
-            channels = [self._midi_strum_channel - 1]
-        else:
-            channels = list(range(16))
-        
-        # Queue pitch bend messages (0xE0 + channel)
-        for channel in channels:
-            pitch_bend_message = bytes([0xE0 + channel, lsb, msb])
-            self._queue_midi_event(pitch_bend_message)
+        # Queue pitch bend messages (0xE0 + channel) on the strum channel(s)
+        self._queue_midi_batch(pitch_bend_batch(midi_bend, self._channel_mask))
     
     def release_notes(self, notes: List[NoteObject]) -> None:
-        """Immediately release specific notes by canceling timers and sending note-offs"""
+        """Immediately release specific notes by canceling pending note-offs and sending note-offs"""
         if not self.jack_client or not self.midi_out_port or not notes:
             return
         
-        # Determine which channels to send on
-        if self._midi_strum_channel is not None:
-            channels = [self._midi_strum_channel - 1]
-        else:
-            channels = list(range(16))
+        mask = self._channel_mask
+        pack = _OUT_RECORD.pack
         
         # Convert notes to MIDI note numbers and release them
-        for note in notes:
-            midi_note = Note.notation_to_midi(note.notation + str(note.octave))
-            note_key = (midi_note, tuple(channels))
-            
-            # Cancel the timer if it exists
-            with self._timer_lock:
-                if note_key in self._active_note_timers:
-                    timer = self._active_note_timers[note_key]
-                    timer.cancel()
-                    del self._active_note_timers[note_key]
-                if note_key in self._note_start_times:
-                    del self._note_start_times[note_key]
-            
-            # Queue note-off messages
-            for channel in channels:
-                note_off_message = bytes([0x80 + channel, midi_note, 0x40])
-                self._queue_midi_event(note_off_message)
+        off_batches = [note_off_batch(note.midi, mask) for note in notes]
+        
+        def build_records(frame: int) -> bytes:
+            # Cancel the pending note-offs, then send them now
+            records = []
+            for off_batch in off_batches:
+                records.extend(pack(_CANCEL_NOTE_OFF, frame, 0, message) for message in off_batch)
+                records.extend(pack(_SEND, frame, 0, message) for message in off_batch)
+            return b''.join(records)
+        
+        self._write_records(build_records, sum(len(off_batch) for off_batch in off_batches), release=True)
     
     def send_note(self, note: NoteObject, velocity: int, duration: float = 1.5) -> None:
         """Send a MIDI note with non-blocking note-off"""
         if not self.jack_client or not self.midi_out_port:
             return
         
-        midi_note = Note.notation_to_midi(note.notation + str(note.octave))
-        
-        # Determine which channels to send on
-        if self._midi_strum_channel is not None:
-            channels = [self._midi_strum_channel - 1]
-        else:
-            channels = list(range(16))
-        
-        # Create unique key for this note+channels combination
-        note_key = (midi_note, tuple(channels))
-        
-        # Cancel any existing timer for this note to prevent premature note-off
-        with self._timer_lock:
-            if note_key in self._active_note_timers:
-                old_timer = self._active_note_timers[note_key]
-                old_timer.cancel()
-                del self._active_note_timers[note_key]
-        
-        # Queue note-on messages
-        for channel in channels:
-            note_on_message = bytes([0x90 + channel, midi_note, velocity])
-            self._queue_midi_event(note_on_message)
-        
-        # Track when this note started
-        with self._timer_lock:
-            self._note_start_times[note_key] = time.time()
-        
-        # Schedule note-off with a timer that can be cancelled
-        def send_note_off():
-            if self.jack_client and self.midi_out_port:
-                for channel in channels:
-                    note_off_message = bytes([0x80 + channel, midi_note, 0x40])
-                    self._queue_midi_event(note_off_message)
-            
-            # Remove this timer from active timers
-            with self._timer_lock:
-                if note_key in self._active_note_timers:
-                    del self._active_note_timers[note_key]
-                if note_key in self._note_start_times:
-                    del self._note_start_times[note_key]
-        
-        # Create and store the timer
-        timer = threading.Timer(duration, send_note_off)
-        timer.daemon = True
-        with self._timer_lock:
-            self._active_note_timers[note_key] = timer
-        timer.start()
+        midi_note = note.midi
+        self._send_note_number(midi_note, velocity, self._channel_mask, duration)
     
     def send_raw_note(self, midi_note: int, velocity: int, channel: Optional[int] = None, duration: float = 1.5) -> None:
         """
@@ -377,87 +703,56 @@ class JackMidi(EventEmitter):
         if not self.jack_client or not self.midi_out_port:
             return
         
-        # Determine which channel to send on
-        if channel is not None:
-            channels = [channel - 1]
-        elif self._midi_strum_channel is not None:
-            channels = [self._midi_strum_channel - 1]
-        else:
-            channels = list(range(16))
-        
-        # Create unique key for this note+channels combination
-        note_key = (midi_note, tuple(channels))
-        
-        # Cancel any existing timer for this note to prevent premature note-off
-        with self._timer_lock:
-            if note_key in self._active_note_timers:
-                old_timer = self._active_note_timers[note_key]
-                old_timer.cancel()
-                del self._active_note_timers[note_key]
-        
-        # Queue note-on messages
-        for ch in channels:
-            note_on_message = bytes([0x90 + ch, midi_note, velocity])
-            self._queue_midi_event(note_on_message)
-        
-        # Track when this note started
-        with self._timer_lock:
-            self._note_start_times[note_key] = time.time()
-        
-        # Schedule note-off with a timer that can be cancelled
-        def send_note_off():
-            if self.jack_client and self.midi_out_port:
-                for ch in channels:
-                    note_off_message = bytes([0x80 + ch, midi_note, 0x40])
-                    self._queue_midi_event(note_off_message)
-            
-            # Remove this timer from active timers
-            with self._timer_lock:
-                if note_key in self._active_note_timers:
-                    del self._active_note_timers[note_key]
-                if note_key in self._note_start_times:
-                    del self._note_start_times[note_key]
-        
-        timer = threading.Timer(duration, send_note_off)
-        timer.daemon = True
-        
-        # Store timer to allow cancellation
-        with self._timer_lock:
-            self._active_note_timers[note_key] = timer
+        # Use the provided channel, otherwise the strum channel(s)
+        mask = channel_mask(channel) if channel is not None else self._channel_mask
+        self._send_note_number(midi_note, velocity, mask, duration)
+    
+    def _send_note_number(self, midi_note: int, velocity: int, mask: int, duration: float) -> None:
+        """
+        Queue note-ons on every channel in a mask and schedule the matching note-offs
         
-        timer.start()
+        Args:
+            midi_note: MIDI note number (0-127)
+            velocity: MIDI velocity (0-127)
+            mask: Channel mask
+            duration: Duration in seconds before note-off
+        """
+        on_batch = note_on_batch(midi_note, velocity, mask)
+        off_batch = note_off_batch(midi_note, mask)
+        duration_frames = int(duration * self.jack_client.samplerate)
+        pack = _OUT_RECORD.pack
+        
+        def build_records(frame: int) -> bytes:
+            # Note-ons, then the note-offs in JACK frame time; scheduling replaces any pending
+            # note-off for the same channel/note so a retrigger is not cut short
+            due_frame = (frame + duration_frames) & 0xFFFFFFFF
+            records = [pack(_SEND, frame, 0, message) for message in on_batch]
+            records.extend(pack(_SCHEDULE_NOTE_OFF, frame, due_frame, message) for message in off_batch)
+            return b''.join(records)
+        
+        self._write_records(build_records, len(on_batch))
     
     def on_note_down(self, notation: str, octave: int) -> None:
         """Handle note down event"""
-        note_str = notation + str(octave)
-        if note_str not in self._notes:
-            self._notes.append(note_str)
-            self._notes = Note.sort(self._notes)
-            
-            # Emit event with proper event object
-            self.emit(
-                NOTE_EVENT,
-                MidiNoteEvent(
-                    notes=self._notes.copy(),
-                    added=note_str
-                )
-            )
+        self._press_note((octave + 1) * 12 + Note.index_of_notation(notation))
     
     def on_note_up(self, notation: str, octave: int) -> None:
         """Handle note up event"""
-        note_str = notation + str(octave)
-        if note_str in self._notes:
-            self._notes.remove(note_str)
-            self._notes = Note.sort(self._notes)
-            
-            # Emit event with proper event object
-            self.emit(
-                NOTE_EVENT,
-                MidiNoteEvent(
-                    notes=self._notes.copy(),
-                    removed=note_str
-                )
-            )
+        self._release_note((octave + 1) * 12 + Note.index_of_notation(notation))
+    
+    def _press_note(self, midi_note: int) -> None:
+        """Mark an input note as held and emit a note event if it was not already"""
+        bit = 1 << midi_note
+        if not self._held_notes & bit:
+            self._held_notes |= bit
+            self.emit(NOTE_EVENT, MidiNoteEvent(note_mask=self._held_notes, added_note=midi_note))
+    
+    def _release_note(self, midi_note: int) -> None:
+        """Mark an input note as released and emit a note event if it was held"""
+        bit = 1 << midi_note
+        if self._held_notes & bit:
+            self._held_notes &= ~bit
+            self.emit(NOTE_EVENT, MidiNoteEvent(note_mask=self._held_notes, removed_note=midi_note))
     
     def choose_input(self, input_id: str) -> None:
         """Choose MIDI input - for Jack, this is handled via external connections"""
@@ -466,12 +761,9 @@ class JackMidi(EventEmitter):
     
     def close(self) -> None:
         """Close Jack MIDI connections"""
-        # Cancel all active note timers
-        with self._timer_lock:
-            for timer in self._active_note_timers.values():
-                timer.cancel()
-            self._active_note_timers.clear()
-            self._note_start_times.clear()
+        stats = self.get_output_stats()
+        print(f"[Jack MIDI] Output: {stats['eventsSent']} events sent, {stats['noteOnsDropped']} note-ons dropped, "
+              f"{stats['controllersCoalesced']} controller values coalesced, {stats['lateEvents']} late")
         
         if self.jack_client:
             try:
@@ -481,6 +773,14 @@ class JackMidi(EventEmitter):
             except Exception as e:
                 pass  # Silently handle cleanup errors
         
+        # Handle whatever input the callback already copied, then stop the worker
+        self._stop_input_worker()
+        for fd in (self._in_wake_read, self._in_wake_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        
         # Emit disconnection event
         self.emit(
             CONNECTION_EVENT,
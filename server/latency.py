@@ -0,0 +1,74 @@
+"""
+Latency Statistics
+
+Tracks the time from when a HID report was read to when the MIDI message it
+triggered was handed to the output backend.
+"""
+
+import time
+import threading
+from typing import Dict, Any
+
+
+class LatencyStats:
+    """Running count, mean and maximum of a latency measured in nanoseconds"""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Label used when printing the summary
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded samples"""
+        with self._lock:
+            self.count = 0
+            self.total_ns = 0
+            self.max_ns = 0
+            self.last_ns = 0
+
+    def record_since(self, timestamp_ns: int) -> int:
+        """
+        Record the latency from a monotonic timestamp until now
+
+        Args:
+            timestamp_ns: time.monotonic_ns() when the input was read
+
+        Returns:
+            The recorded latency in nanoseconds
+        """
+        latency_ns = time.monotonic_ns() - timestamp_ns
+        with self._lock:
+            self.count += 1
+            self.total_ns += latency_ns
+            self.last_ns = latency_ns
+            if latency_ns > self.max_ns:
+                self.max_ns = latency_ns
+        return latency_ns
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current statistics
+
+        Returns:
+            Dictionary with count and mean/max/last latency in milliseconds
+        """
+        with self._lock:
+            mean_ns = self.total_ns / self.count if self.count else 0.0
+            return {
+                'count': self.count,
+                'meanMs': mean_ns / 1e6,
+                'maxMs': self.max_ns / 1e6,
+                'lastMs': self.last_ns / 1e6
+            }
+
+    def summary(self) -> str:
+        """Format the statistics for logging"""
+        stats = self.snapshot()
+        if stats['count'] == 0:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: {stats['count']} samples, mean {stats['meanMs']:.2f} ms, "
+                f"max {stats['maxMs']:.2f} ms")
@@ -7,8 +7,7 @@ import time
 import atexit
 import asyncio
 import math
-from typing import Dict, Any, Union, Optional, Callable
-from dataclasses import asdict
+from typing import Dict, Any, List, Union, Optional, Callable
 
 from finddevice import find_and_open_device, find_and_open_all_interfaces, HotplugMonitor
 from strummer import strummer
@@ -18,19 +17,30 @@ from midievent import MidiNoteEvent, NOTE_EVENT
 from note import Note
 from websocketserver import SocketServer
 from webserver import WebServer
-from hidreader import HIDReader
+from hidreader import HIDReader, TabletSample, SAMPLE_STYLUS, SAMPLE_BUTTONS
+from hidcapture import CaptureWriter, ReplaySource
+import hidraw
 from datahelpers import apply_effect
+from latency import LatencyStats
+from engine import StrumEngine
+from repeater import NoteRepeater
+from notecoalescer import NoteEventCoalescer
 from config import Config
 from actions import Actions
 
 # Global references for cleanup
 _hid_readers = []  # Multiple readers for multiple interfaces (stylus, buttons, etc.)
 _midi = None
+_engine = None  # Strum engine thread fed by the HID readers
+_note_repeater = None  # Note repeater, driven by the engine's timer
+_note_coalescer = None  # Collects bursts of MIDI input note events, driven by the engine's timer
 _socket_server = None
 _web_server = None
 _event_loop = None
 _loop_thread = None
 _hotplug_monitor = None
+_hid_capture = None  # Optional raw HID report recorder
+_input_latency = LatencyStats('[Latency] HID read -> MIDI send')
 
 # Global tablet connection state
 _tablet_connected = False
@@ -39,7 +49,7 @@ _tablet_device_info = None
 
 def cleanup_resources():
     """Clean up device and MIDI resources"""
-    global _hid_readers, _midi, _socket_server, _web_server, _event_loop, _loop_thread, _hotplug_monitor, _tablet_connected, _tablet_device_info
+    global _hid_readers, _midi, _engine, _socket_server, _web_server, _event_loop, _loop_thread, _hotplug_monitor, _tablet_connected, _tablet_device_info, _hid_capture
     
     print("\nCleaning up resources...")
     
@@ -106,8 +116,26 @@ def cleanup_resources():
                 print(f"Error closing HID reader: {e}")
     _hid_readers = []
     
+    # Stop the engine once nothing can push samples into it
+    if _engine is not None:
+        try:
+            _engine.stop()
+        except Exception as e:
+            print(f"Error stopping engine: {e}")
+        _engine = None
+    
+    # Close the HID capture file once all readers have stopped
+    if _hid_capture is not None:
+        try:
+            _hid_capture.close()
+        except Exception as e:
+            print(f"Error closing HID capture: {e}")
+        _hid_capture = None
+    
     # Close MIDI
     if _midi is not None:
+        if _input_latency.count:
+            print(_input_latency.summary())
         try:
             print("Closing MIDI connections...")
             _midi.close()
@@ -207,17 +235,31 @@ def broadcast_strummer_notes(socket_server: Optional[SocketServer]) -> None:
     """
     if socket_server is not None:
         try:
-            notes_state = strummer.get_notes_state()
-            message = json.dumps(notes_state)
-            socket_server.send_message_sync(message)
+            socket_server.send_message_sync(strummer.get_notes_json())
         except Exception as e:
             print(f"[SERVER] Error broadcasting strummer notes: {e}")
 
 
+def run_on_engine(callback: Callable[[], None]) -> None:
+    """
+    Run a callback that changes strum state on the engine thread.
+    
+    Runs it immediately if the engine has not been started.
+    
+    Args:
+        callback: Function to call with no arguments
+    """
+    if _engine is not None:
+        _engine.call_soon(callback)
+    else:
+        callback()
+
+
 def on_midi_note_event(event: MidiNoteEvent, cfg: Config, socket_server: Optional[SocketServer] = None):
     """Handle MIDI note events - defined at module level to avoid garbage collection"""
     # Use notes from the event object instead of accessing midi.notes directly
-    midi_notes = [Note.parse_notation(n) for n in event.notes]
+    # (MIDI input numbers count C4 as 60; NoteObject.midi counts it as 48)
+    midi_notes = [Note.from_midi(n - 12) for n in event.note_numbers]
     
     strumming_cfg = cfg.get('strumming', {})
     strummer.notes = Note.fill_note_spread(
@@ -228,14 +270,23 @@ def on_midi_note_event(event: MidiNoteEvent, cfg: Config, socket_server: Optiona
     # Note: broadcast happens automatically via strummer's notes_changed event
 
 
-def setup_midi_and_strummer(cfg: Config, socket_server: Optional[SocketServer] = None) -> Midi:
-    """Setup MIDI connection and strummer configuration"""
-    # Configure strummer parameters
+def configure_strummer(cfg: Config) -> None:
+    """Apply the strumming settings to the strummer"""
     strumming_cfg = cfg.get('strumming', {})
     strummer.configure(
-        pluck_velocity_scale=strumming_cfg.get('pluckVelocityScale', 4.0),
-        pressure_threshold=strumming_cfg.get('pressureThreshold', 0.1)
+        pressure_threshold=strumming_cfg.get('pressureThreshold', 0.1),
+        string_widths=strumming_cfg.get('stringWidths') or None,
+        primary_string_width=strumming_cfg.get('primaryStringWidth', 1.0),
+        dead_zone=strumming_cfg.get('deadZone', 0.0),
+        hysteresis=strumming_cfg.get('hysteresis', 0.0),
+        velocity_curve=strumming_cfg.get('velocityCurve', 1.0)
     )
+
+
+def setup_midi_and_strummer(cfg: Config, socket_server: Optional[SocketServer] = None) -> Midi:
+    """Setup MIDI connection and strummer configuration"""
+    # Configure strummer parameters
+    configure_strummer(cfg)
     
     # Initialize strummer with initial notes if provided
     strumming_cfg = cfg.get('strumming', {})
@@ -278,9 +329,16 @@ def setup_midi_and_strummer(cfg: Config, socket_server: Optional[SocketServer] =
         midi = Midi(midi_strum_channel=midi_channel)
         print(f"[MIDI] Backend type: {type(midi).__name__}")
     
-    # Create a lambda that captures cfg and socket_server
+    # Bursts of note events (e.g. a chord) rebuild the strummer notes once, with the
+    # latest held notes; strummer notes are only changed on the engine thread
+    global _note_coalescer
+    _note_coalescer = NoteEventCoalescer(
+        lambda event: on_midi_note_event(event, cfg, socket_server),
+        cfg.midi_input_coalesce_ms / 1000.0
+    )
+    
     def handler(event):
-        on_midi_note_event(event, cfg, socket_server)
+        run_on_engine(lambda: _note_coalescer.push(event))
     
     # Store handler reference to prevent garbage collection
     midi._note_handler = handler
@@ -297,37 +355,28 @@ def update_config(cfg: Config, updates: Dict[str, Any], socket_server: Optional[
     Update configuration with key-value pairs from incoming messages.
     Supports nested keys using dot notation (e.g., "device.product").
     """
-    # Track if note spread changed
+    # Track if note spread or other strumming settings changed
     note_spread_changed = False
+    strumming_changed = False
     
     for key, value in updates.items():
         # Check if this is a note spread update
         if key in ['strumming.upperNoteSpread', 'strumming.lowerNoteSpread', 'upperNoteSpread', 'lowerNoteSpread']:
             note_spread_changed = True
+        elif key == 'strumming' or key.startswith('strumming.'):
+            strumming_changed = True
         
         # Use Config.set() method which handles dot notation
         cfg.set(key, value)
         print(f'[CONFIG] Updated {key} = {value}')
     
     # If note spreads changed and we have strummer notes, recalculate with new spreads
-    if note_spread_changed and strummer.notes:
-        # Get base notes from strummer
-        notes_state = strummer.get_notes_state()
-        base_notes_dicts = notes_state.get('baseNotes', [])
-        
-        if base_notes_dicts:
-            # Convert dictionaries back to NoteObject instances
-            from note import NoteObject
-            base_notes = [NoteObject(**note_dict) for note_dict in base_notes_dicts]
-            
-            strumming_cfg = cfg.get('strumming', {})
-            strummer.notes = Note.fill_note_spread(
-                base_notes,
-                strumming_cfg.get('lowerNoteSpread', 0),
-                strumming_cfg.get('upperNoteSpread', 0)
-            )
-            print(f'[CONFIG] Recalculated strummer notes with new spreads: {len(strummer.notes)} notes')
-            # Note: broadcast happens automatically via strummer's notes_changed event
+    if note_spread_changed:
+        run_on_engine(lambda: recalculate_note_spread(cfg))
+    
+    # Apply string layout and pressure settings to the strummer
+    if strumming_changed:
+        run_on_engine(lambda: configure_strummer(cfg))
     
     # Broadcast the updated config to all WebSocket clients
     if socket_server is not None:
@@ -342,6 +391,22 @@ def update_config(cfg: Config, updates: Dict[str, Any], socket_server: Optional[
             print(f"[CONFIG] Error broadcasting config: {e}")
 
 
+def recalculate_note_spread(cfg: Config) -> None:
+    """Rebuild the strummer notes from its base notes using the configured note spreads"""
+    if strummer.notes:
+        base_notes = strummer.base_notes
+        
+        if base_notes:
+            strumming_cfg = cfg.get('strumming', {})
+            strummer.notes = Note.fill_note_spread(
+                base_notes,
+                strumming_cfg.get('lowerNoteSpread', 0),
+                strumming_cfg.get('upperNoteSpread', 0)
+            )
+            print(f'[CONFIG] Recalculated strummer notes with new spreads: {len(strummer.notes)} notes')
+            # Note: broadcast happens automatically via strummer's notes_changed event
+
+
 def get_device_status() -> Dict[str, Any]:
     """Get current tablet device connection status"""
     global _tablet_connected, _tablet_device_info
@@ -369,7 +434,7 @@ def start_socket_server(port: int, cfg: Config) -> tuple[SocketServer, asyncio.A
     socket_server = SocketServer(
         on_message=handle_message, 
         config_callback=lambda: cfg.to_dict(),
-        initial_notes_callback=lambda: strummer.get_notes_state(),
+        initial_notes_callback=lambda: strummer.get_notes_json(),
         device_status_callback=get_device_status
     )
     
@@ -392,7 +457,8 @@ def start_socket_server(port: int, cfg: Config) -> tuple[SocketServer, asyncio.A
     return socket_server, loop, thread
 
 
-def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_server: Optional[SocketServer] = None) -> Callable[[Dict[str, Union[str, int, float]]], None]:
+def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_server: Optional[SocketServer] = None,
+                            repeater: Optional[NoteRepeater] = None) -> Callable[[TabletSample], None]:
     """
     Create a callback function to handle processed HID data
     
@@ -400,6 +466,7 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
         cfg: Configuration instance
         midi: MIDI instance
         socket_server: Optional socket server for broadcasting events
+        repeater: Note repeater to drive; it only fires if registered as an engine timer
         
     Returns:
         Callback function that processes HID data and sends MIDI messages
@@ -424,12 +491,21 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
     
     actions.on('config_changed', on_action_config_changed)
     
-    # Storage for note repeater feature
-    repeater_state = {
-        'notes': [],
-        'last_repeat_time': 0,
-        'is_holding': False
-    }
+    # Note repeater - repeats are fired by the engine timer, not by incoming samples
+    if repeater is None:
+        repeater = NoteRepeater()
+    repeater.stop()
+    
+    def play_repeat(notes: List[Dict[str, Any]], repeat_velocity: int, duration: float) -> None:
+        """Play one repeat of the held notes (called from the engine timer)"""
+        transpose_enabled = actions.is_transpose_active()
+        transpose_semitones = actions.get_transpose_semitones()
+        for note_data in notes:
+            # Apply transpose if enabled
+            note_to_play = note_data['note']
+            if transpose_enabled:
+                note_to_play = note_to_play.transpose(transpose_semitones)
+            midi.send_note(note_to_play, repeat_velocity, duration)
     
     # Track button press states to detect button down events
     button_state = {
@@ -437,28 +513,67 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
         'secondaryButtonPressed': False
     }
     
-    # Track tablet button states (buttons 1-8)
-    tablet_button_state = {f'button{i}': False for i in range(1, 9)}
+    # Track tablet button states (bitmask, bit 0 = button 1)
+    tablet_button_state = {'buttons': 0}
     
     # Throttle state for WebSocket broadcasts (100ms = 10 times per second)
     throttle_state = {
-        'last_broadcast_time': 0,
-        'throttle_interval': 0.1  # 100ms in seconds
+        'last_broadcast_ns': 0,
+        'throttle_interval_ns': 100_000_000  # 100ms in nanoseconds
     }
     
-    def handle_hid_data(result: Dict[str, Union[str, int, float]]) -> None:
-        """Handle processed HID data - send MIDI messages based on strumming"""
+    def handle_button_sample(sample: TabletSample) -> None:
+        """Handle a tablet button report - detect button edges and run their actions"""
+        # Only changed bits need work
+        buttons = sample.buttons
+        changed = buttons ^ tablet_button_state['buttons']
+        if changed:
+            tablet_buttons_cfg = cfg.get('tabletButtons', {})
+            for i in range(1, 9):
+                mask = 1 << (i - 1)
+                if not changed & mask:
+                    continue
+                
+                if buttons & mask:
+                    # Button just pressed - execute configured action
+                    action = tablet_buttons_cfg.get(str(i))
+                    if action:
+                        actions.execute(action, context={'button': f'Tablet{i}'})
+                    
+                    # Broadcast button press to WebSocket
+                    broadcast_to_socket(socket_server, 'tablet_button', {
+                        'button': i - 1,  # 0-indexed for frontend
+                        'pressed': True
+                    })
+                else:
+                    # Button released
+                    broadcast_to_socket(socket_server, 'tablet_button', {
+                        'button': i - 1,  # 0-indexed for frontend
+                        'pressed': False
+                    })
+            
+            # Update tablet button state
+            tablet_button_state['buttons'] = buttons
+    
+    def handle_stylus_sample(sample: TabletSample) -> None:
+        """Handle a stylus report - send MIDI messages based on strumming"""
         
-        # Extract raw data values
-        x = result.get('x', 0.0)
-        y = result.get('y', 0.0)
-        pressure = result.get('pressure', 0.0)
-        tilt_x = result.get('tiltX', 0.0)
-        tilt_y = result.get('tiltY', 0.0)
+        # Monotonic time the report was read; strum velocity is measured from it
+        timestamp_ns = sample.timestamp_ns or time.monotonic_ns()
+        # Real time the report was handed over; a replay keeps the recorded timing
+        # in timestamp_ns, which may run ahead of the clock. Deadlines and latency use this
+        received_ns = sample.received_ns or timestamp_ns
+        
+        # Decoded values are already normalized floats
+        x = sample.x
+        y = sample.y
+        pressure = sample.pressure
+        tilt_x = sample.tilt_x
+        tilt_y = sample.tilt_y
         
         # Handle stylus button presses
-        primary_pressed = result.get('primaryButtonPressed', False)
-        secondary_pressed = result.get('secondaryButtonPressed', False)
+        primary_pressed = sample.primary_button
+        secondary_pressed = sample.secondary_button
         
         # Get stylus button configuration
         stylus_buttons_cfg = cfg.get('stylusButtons', {})
@@ -478,39 +593,11 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
         button_state['primaryButtonPressed'] = primary_pressed
         button_state['secondaryButtonPressed'] = secondary_pressed
         
-        # Handle tablet button presses (buttons 1-8)
-        tablet_buttons_cfg = cfg.get('tabletButtons', {})
-        for i in range(1, 9):
-            button_key = f'button{i}'
-            button_pressed = result.get(button_key, False)
-            
-            # Detect button down event (transition from not pressed to pressed)
-            if button_pressed and not tablet_button_state[button_key]:
-                # Button just pressed - execute configured action
-                action = tablet_buttons_cfg.get(str(i))
-                if action:
-                    actions.execute(action, context={'button': f'Tablet{i}'})
-                
-                # Broadcast button press to WebSocket
-                broadcast_to_socket(socket_server, 'tablet_button', {
-                    'button': i - 1,  # 0-indexed for frontend
-                    'pressed': True
-                })
-            elif not button_pressed and tablet_button_state[button_key]:
-                # Button released
-                broadcast_to_socket(socket_server, 'tablet_button', {
-                    'button': i - 1,  # 0-indexed for frontend
-                    'pressed': False
-                })
-            
-            # Update tablet button state
-            tablet_button_state[button_key] = button_pressed
-        
         # Calculate all possible input values (normalized 0-1)
-        y_val = float(y)
-        pressure_val = float(pressure)
-        tilt_x_val = float(tilt_x)
-        tilt_y_val = float(tilt_y)
+        y_val = y
+        pressure_val = pressure
+        tilt_x_val = tilt_x
+        tilt_y_val = tilt_y
         # Calculate tiltXY magnitude with sign based on tiltX * tiltY
         magnitude = math.sqrt(tilt_x_val * tilt_x_val + tilt_y_val * tilt_y_val)
         sign = 1 if (tilt_x_val * tilt_y_val) >= 0 else -1
@@ -518,13 +605,12 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
         tilt_xy_val = max(-1.0, min(1.0, magnitude * sign))
         
         # Throttled broadcast of tablet data to WebSocket
-        current_time = time.time()
-        if socket_server and (current_time - throttle_state['last_broadcast_time']) >= throttle_state['throttle_interval']:
-            throttle_state['last_broadcast_time'] = current_time
+        if socket_server and (received_ns - throttle_state['last_broadcast_ns']) >= throttle_state['throttle_interval_ns']:
+            throttle_state['last_broadcast_ns'] = received_ns
             broadcast_to_socket(socket_server, 'tablet_data', {
-                'x': float(x),
-                'y': float(y),
-                'pressure': float(pressure),
+                'x': x,
+                'y': y,
+                'pressure': pressure,
                 'tiltX': tilt_x_val,
                 'tiltY': tilt_y_val,
                 'tiltXY': tilt_xy_val,
@@ -558,7 +644,7 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
         duration = apply_effect(note_duration_cfg, control_inputs, 'noteDuration')
         velocity = apply_effect(note_velocity_cfg, control_inputs, 'noteVelocity')
         
-        strum_result = strummer.strum(float(x), float(pressure))
+        strum_result = strummer.strum(x, pressure, timestamp_ns)
         
         # Get note repeater configuration
         note_repeater_cfg = cfg.get('noteRepeater', {})
@@ -574,9 +660,7 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
         if strum_result:
             if strum_result.get('type') == 'strum':
                 # Store notes for repeater and mark as holding
-                repeater_state['notes'] = strum_result['notes']
-                repeater_state['is_holding'] = True
-                repeater_state['last_repeat_time'] = time.time()
+                repeater.start(strum_result['notes'], received_ns, play_repeat)
                 
                 # Play notes from strum
                 for note_data in strum_result['notes']:
@@ -587,21 +671,17 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
                         if transpose_enabled:
                             note_to_play = note_to_play.transpose(transpose_semitones)
                         midi.send_note(note_to_play, note_data['velocity'], duration)
+                        _input_latency.record_since(received_ns)
                         
                         # Broadcast string pluck to WebSocket
-                        # Find which string index was plucked by matching the note
-                        for string_idx, strummer_note in enumerate(strummer.notes):
-                            if strummer_note == note_data['note']:
-                                broadcast_to_socket(socket_server, 'string_pluck', {
-                                    'string': string_idx,
-                                    'velocity': note_data['velocity']
-                                })
-                                break
+                        broadcast_to_socket(socket_server, 'string_pluck', {
+                            'string': note_data['string'],
+                            'velocity': note_data['velocity']
+                        })
             
             elif strum_result.get('type') == 'release':
                 # Stop holding - no more repeats
-                repeater_state['is_holding'] = False
-                repeater_state['notes'] = []
+                repeater.stop()
                 
                 # Handle strum release - send configured MIDI note
                 strum_release_cfg = cfg.get('strumRelease', {})
@@ -620,37 +700,91 @@ def create_hid_data_handler(cfg: Config, midi: Union[Midi, JackMidi], socket_ser
                     # Send the raw MIDI note on the specified channel
                     midi.send_raw_note(release_note, release_velocity, release_channel, duration)
         
-        # Handle note repeater - fire repeatedly while holding
-        if note_repeater_enabled and repeater_state['is_holding'] and repeater_state['notes']:
-            current_time = time.time()
-            time_since_last_repeat = current_time - repeater_state['last_repeat_time']
-            
-            # Apply frequency multiplier to duration (higher = faster repeats)
-            repeat_interval = duration / frequency_multiplier if frequency_multiplier > 0 else duration
-            
-            # Check if it's time for another repeat
-            if time_since_last_repeat >= repeat_interval:
-                # Apply pressure multiplier to velocity
-                repeat_velocity = int(velocity * pressure_multiplier)
-                # Clamp to MIDI range 1-127
-                repeat_velocity = max(1, min(127, repeat_velocity))
-                
-                for note_data in repeater_state['notes']:
-                    if repeat_velocity > 0:
-                        # Apply transpose if enabled
-                        note_to_play = note_data['note']
-                        if transpose_enabled:
-                            note_to_play = note_to_play.transpose(transpose_semitones)
-                        midi.send_note(note_to_play, repeat_velocity, duration)
-                
-                repeater_state['last_repeat_time'] = current_time
+        # Update note repeater parameters from this sample
+        # Apply frequency multiplier to duration (higher = faster repeats)
+        repeat_interval = duration / frequency_multiplier if frequency_multiplier > 0 else duration
+        # Apply pressure multiplier to velocity, clamped to MIDI range 1-127
+        repeat_velocity = max(1, min(127, int(velocity * pressure_multiplier)))
+        repeater.update(note_repeater_enabled, repeat_interval, repeat_velocity, duration)
+    
+    # Route each sample by kind, so button reports never reach the strum engine
+    sample_handlers = {
+        SAMPLE_STYLUS: handle_stylus_sample,
+        SAMPLE_BUTTONS: handle_button_sample
+    }
+    
+    def handle_hid_data(sample: TabletSample) -> None:
+        """Handle a decoded HID sample by dispatching it to the handler for its kind"""
+        sample_handlers[sample.kind](sample)
     
     return handle_hid_data
 
 
+def open_hid_readers(cfg: Config, tablet_config: Dict[str, Any], data_handler: Callable[[TabletSample], None],
+                     warning_callback: Optional[Callable[[str], None]] = None, capture: Optional[CaptureWriter] = None) -> list:
+    """
+    Open the tablet interfaces and create readers for the configured HID backend.
+    
+    The hidraw backend serves every interface from one reader; hidapi creates one
+    reader per interface. Falls back to hidapi if hidraw is unavailable. If a
+    replay file is configured, it is used instead of the tablet.
+    
+    Args:
+        cfg: Configuration instance
+        tablet_config: Drawing tablet configuration (from startupConfiguration.drawingTablet)
+        data_handler: Callback for processed HID data
+        warning_callback: Optional callback for warnings
+        capture: Optional capture writer that records every raw report
+        
+    Returns:
+        List of readers (empty if no interface could be opened)
+    """
+    if cfg.hid_replay_file:
+        if os.path.exists(cfg.hid_replay_file):
+            return [ReplaySource(cfg.hid_replay_file, cfg, data_handler, warning_callback,
+                                 realtime=cfg.hid_replay_realtime, engine=_engine)]
+        print(f"[Replay] Capture file not found: {cfg.hid_replay_file}")
+        return []
+    
+    if cfg.hid_backend == 'hidraw':
+        if hidraw.is_available():
+            interfaces = hidraw.find_hidraw_interfaces(tablet_config)
+            if interfaces:
+                multiplexer = hidraw.HidrawMultiplexer(interfaces, cfg, data_handler, warning_callback, capture=capture)
+                if multiplexer.open():
+                    print(f"[HID] Using hidraw backend for {len(interfaces)} interface(s)")
+                    return [multiplexer]
+                multiplexer.close()
+            print("[HID] Could not open hidraw nodes, falling back to hidapi")
+        else:
+            print("[HID] hidraw backend is only available on Linux, falling back to hidapi")
+    
+    # devices is a list of tuples: [(interface_num, device), ...]
+    devices = find_and_open_all_interfaces(tablet_config)
+    readers = []
+    for interface_num, device in devices:
+        print(f"[HID] Creating reader for interface {interface_num}")
+        readers.append(HIDReader(device, cfg, data_handler, warning_callback=warning_callback,
+                                 interface_num=interface_num, capture=capture))
+    return readers
+
+
+def start_hid_readers(readers: list) -> None:
+    """Start each reader in its own background thread"""
+    def start_reading(r):
+        try:
+            r.start_reading()
+        except Exception as e:
+            print(f"[HID] Error in reader: {e}")
+    
+    for reader in readers:
+        read_thread = threading.Thread(target=start_reading, args=(reader,), daemon=True)
+        read_thread.start()
+
+
 def main():
     """Main application entry point"""
-    global _hid_readers, _midi, _socket_server, _web_server, _event_loop, _loop_thread, _hotplug_monitor, _tablet_connected, _tablet_device_info
+    global _hid_readers, _midi, _engine, _note_repeater, _socket_server, _web_server, _event_loop, _loop_thread, _hotplug_monitor, _tablet_connected, _tablet_device_info, _hid_capture
     
     # Register cleanup function to run on exit
     atexit.register(cleanup_resources)
@@ -691,6 +825,20 @@ def main():
     # Setup MIDI and strummer
     _midi = setup_midi_and_strummer(cfg, _socket_server)
     
+    # All strum, effect and MIDI work runs on the engine thread; HID readers only queue samples
+    _note_repeater = NoteRepeater()
+    _engine = StrumEngine(create_hid_data_handler(cfg, _midi, _socket_server, _note_repeater),
+                          timers=[_note_repeater, _note_coalescer])
+    _engine.start()
+    
+    # Optionally record raw HID reports for later replay
+    if cfg.hid_capture_file:
+        try:
+            _hid_capture = CaptureWriter(cfg.hid_capture_file)
+        except Exception as e:
+            print(f"[Capture] Could not open capture file: {e}")
+            _hid_capture = None
+    
     # Listen for strummer notes changes and broadcast to WebSocket clients
     def on_strummer_notes_changed():
         """Broadcast strummer notes when they change"""
@@ -784,39 +932,23 @@ def main():
         
         startup_cfg['drawingTablet'] = tablet_config
         
-        # Find and open all interfaces for this device
-        devices = find_and_open_all_interfaces(tablet_config)
+        # Fresh handler state for the new device, then find and open all its interfaces
+        _engine.call_soon(lambda: _engine.set_handler(create_hid_data_handler(cfg, _midi, _socket_server, _note_repeater)))
+        readers = open_hid_readers(
+            cfg,
+            tablet_config,
+            _engine.push,
+            warning_callback=lambda msg: broadcast_to_socket(_socket_server, 'warning', {'message': msg}),
+            capture=_hid_capture
+        )
         
-        if not devices:
+        if not readers:
             print(f"[Hotplug] Error: Could not reopen device interfaces")
             return
         
-        print(f"[Hotplug] Opened {len(devices)} interface(s)")
-        
-        # Create HID readers for all interfaces
-        data_handler = create_hid_data_handler(cfg, _midi, _socket_server)
-        
-        # devices is a list of tuples: [(interface_num, device), ...]
-        for interface_num, device in devices:
-            print(f"[Hotplug] Creating reader for interface {interface_num}")
-            
-            reader = HIDReader(
-                device, 
-                cfg, 
-                data_handler, 
-                warning_callback=lambda msg: broadcast_to_socket(_socket_server, 'warning', {'message': msg})
-            )
-            _hid_readers.append(reader)
-            
-            # Start reading in a background thread
-            def start_reading(reader=reader, interface=interface_num):
-                try:
-                    reader.start_reading()
-                except Exception as e:
-                    print(f"[Hotplug] Error starting HID reader for interface {interface}: {e}")
-            
-            read_thread = threading.Thread(target=start_reading, daemon=True)
-            read_thread.start()
+        # Start reading in background threads
+        _hid_readers.extend(readers)
+        start_hid_readers(readers)
         
         print(f"[Hotplug] All {len(_hid_readers)} reader(s) started")
         
@@ -831,8 +963,14 @@ def main():
     # Get tablet device(s) - open ALL interfaces (stylus + buttons may be separate)
     startup_cfg = cfg.get('startupConfiguration', {})
     drawing_tablet_cfg = startup_cfg.get('drawingTablet', {})
-    devices = find_and_open_all_interfaces(drawing_tablet_cfg)
-    if not devices:
+    readers = open_hid_readers(
+        cfg,
+        drawing_tablet_cfg,
+        _engine.push,
+        warning_callback=lambda msg: broadcast_to_socket(_socket_server, 'warning', {'message': msg}),
+        capture=_hid_capture
+    )
+    if not readers:
         print("HID device not available - continuing with MIDI-only mode")
         
         # Update global tablet connection state
@@ -862,7 +1000,7 @@ def main():
         
         print("Strumboli server started (MIDI-only mode). Press Ctrl+C to exit.")
     else:
-        print(f"Strumboli server started with HID device ({len(devices)} interface(s)). Press Ctrl+C to exit.")
+        print(f"Strumboli server started with HID device ({len(readers)} reader(s)). Press Ctrl+C to exit.")
         
         # Update global tablet connection state
         _tablet_connected = True
@@ -901,27 +1039,9 @@ def main():
         except Exception as e:
             print(f"[Hotplug] Could not start hotplug monitor: {e}")
         
-        # Create HID readers for all interfaces (buttons may be on separate interface)
-        data_handler = create_hid_data_handler(cfg, _midi, _socket_server)
-        for interface_num, device in devices:
-            print(f"[HID] Creating reader for interface {interface_num}")
-            reader = HIDReader(
-                device, 
-                cfg, 
-                data_handler, 
-                warning_callback=lambda msg: broadcast_to_socket(_socket_server, 'warning', {'message': msg})
-            )
-            _hid_readers.append(reader)
-            
-            # Start each reader in its own thread
-            def start_reading(r):
-                try:
-                    r.start_reading()
-                except Exception as e:
-                    print(f"[HID] Error in reader: {e}")
-            
-            read_thread = threading.Thread(target=start_reading, args=(reader,), daemon=True)
-            read_thread.start()
+        # Start HID readers for all interfaces (buttons may be on separate interface)
+        _hid_readers.extend(readers)
+        start_hid_readers(readers)
         
     
     # Setup signal handler for graceful shutdown
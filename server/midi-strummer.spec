@@ -34,6 +34,15 @@ hiddenimports = [
     'websocketserver',
     'webserver',
     'hidreader',
+    'hidraw',
+    'hidcapture',
+    'latency',
+    'engine',
+    'repeater',
+    'noteoff',
+    'midisender',
+    'midimessages',
+    'notecoalescer',
     'datahelpers',
     'config',
     'actions',
@@ -51,6 +60,15 @@ a = Analysis(
      'websocketserver.py',
      'webserver.py',
      'hidreader.py',
+     'hidraw.py',
+     'hidcapture.py',
+     'latency.py',
+     'engine.py',
+     'repeater.py',
+     'noteoff.py',
+     'midisender.py',
+     'midimessages.py',
+     'notecoalescer.py',
      'datahelpers.py',
      'config.py',
      'actions.py',
@@ -1,10 +1,23 @@
-import time
-import threading
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 import rtmidi
 from note import Note, NoteObject
-from midievent import MidiConnectionEvent, MidiNoteEvent, NOTE_EVENT, CONNECTION_EVENT
+from midievent import (MidiConnectionEvent, MidiNoteEvent, NOTE_EVENT, CONNECTION_EVENT, MIDI_NOTE_NAMES,
+                       held_note_numbers)
 from eventlistener import EventEmitter
+from noteoff import NoteOffScheduler
+from midisender import MidiSender
+from midimessages import (channel_mask, note_on_batch, note_off_batch,
+                          pitch_bend_batch, describe_mask)
+
+
+def _format_note_on(mask: int, midi_note: int, velocity: int) -> str:
+    """Build the log line for sent note-ons (called on the sender thread)"""
+    return f"[MIDI] Sent NOTE_ON: channels={describe_mask(mask)}, note={midi_note}, velocity={velocity}"
+
+
+def _format_note_off(mask: int, midi_note: int) -> str:
+    """Build the log line for sent note-offs (called on the sender thread)"""
+    return f"[MIDI] Sent NOTE_OFF: channels={describe_mask(mask)}, note={midi_note}"
 
 
 class Midi(EventEmitter):
@@ -15,11 +28,13 @@ class Midi(EventEmitter):
         self.outs: List[rtmidi.MidiOut] = []
         self.inputs: List[rtmidi.MidiIn] = []
         self._current_input_id: Optional[str] = None
-        self._notes: List[str] = []
+        self._held_notes: int = 0  # Bit n set while input MIDI note n is held
         self._midi_strum_channel: Optional[int] = midi_strum_channel
-        self._active_note_timers: dict = {}  # Track active note-off timers by (midi_note, channels_tuple)
-        self._timer_lock = threading.Lock()  # Thread-safe access to timers
-        self._note_start_times: dict = {}  # Track when each note started by (midi_note, channels_tuple)
+        self._channel_mask: int = channel_mask(midi_strum_channel)  # Channels notes are sent on
+        self._note_offs = NoteOffScheduler('MidiNoteOff')  # Pending note-offs keyed by (midi_note, channel_mask)
+        # rtmidi writes (and their logging) happen on the sender thread, never on the caller's
+        self._sender = MidiSender(self._write_message, 'MidiSender')
+        self._sender.start()
 
     @property
     def current_input(self) -> Optional[rtmidi.MidiIn]:
@@ -28,8 +43,8 @@ class Midi(EventEmitter):
 
     @property
     def notes(self) -> List[str]:
-        """Get current notes"""
-        return self._notes
+        """Get current notes, lowest first"""
+        return [MIDI_NOTE_NAMES[n] for n in held_note_numbers(self._held_notes)]
 
     def refresh_connection(self, midi_input_id: Optional[str] = None) -> None:
         """Refresh MIDI connections"""
@@ -117,17 +132,23 @@ class Midi(EventEmitter):
         
         if len(message) >= 3:
             command, note, velocity = message[0], message[1], message[2]
-            notation_list = [*Note.sharp_notations, *Note.sharp_notations]
-            notation = notation_list[note % len(Note.sharp_notations)]
-            octave = note // len(Note.sharp_notations) - 1
             
             if command == 144:  # Note on message
                 if velocity > 0:
-                    self.on_note_down(notation, octave)
+                    self._press_note(note)
                 else:
-                    self.on_note_up(notation, octave)
+                    self._release_note(note)
             elif command == 128:  # Note off message
-                self.on_note_up(notation, octave)
+                self._release_note(note)
+
+    def _write_message(self, message: bytes) -> None:
+        """Write one message to the output port (called on the sender thread)"""
+        if self.midi_out:
+            self.midi_out.send_message(message)
+
+    def get_output_stats(self) -> Dict[str, Any]:
+        """Get MIDI output queue depth and send latency statistics"""
+        return self._sender.get_stats()
 
     def send_pitch_bend(self, bend_value: float) -> None:
         """
@@ -144,105 +165,31 @@ class Midi(EventEmitter):
             midi_bend = int((bend_value + 1.0) * 8192)
             midi_bend = max(0, min(16383, midi_bend))
             
-            # Split into LSB and MSB (7 bits each)
-            lsb = midi_bend & 0x7F
-            msb = (midi_bend >> 7) & 0x7F
-            
-            # Determine which channels to send on
-            if self._midi_strum_channel is not None:
-                channels = [self._midi_strum_channel - 1]
-            else:
-                channels = list(range(16))
-            
-            # Send pitch bend messages (0xE0 + channel)
-            for channel in channels:
-                pitch_bend_message = [0xE0 + channel, lsb, msb]
-                self.midi_out.send_message(pitch_bend_message)
+            # Send pitch bend messages (0xE0 + channel) on the strum channel(s)
+            self._sender.send_batch(pitch_bend_batch(midi_bend, self._channel_mask))
 
     def release_notes(self, notes: List[NoteObject]) -> None:
-        """Immediately release specific notes by canceling timers and sending note-offs"""
+        """Immediately release specific notes by canceling pending note-offs and sending note-offs"""
         if not self.midi_out or not notes:
             return
         
-        # Determine which channels to send on
-        if self._midi_strum_channel is not None:
-            channels = [self._midi_strum_channel - 1]
-        else:
-            channels = list(range(16))
+        mask = self._channel_mask
         
         # Convert notes to MIDI note numbers and release them
         for note in notes:
-            midi_note = Note.notation_to_midi(note.notation + str(note.octave))
-            note_key = (midi_note, tuple(channels))
+            midi_note = note.midi
             
-            # Cancel the timer if it exists
-            with self._timer_lock:
-                if note_key in self._active_note_timers:
-                    timer = self._active_note_timers[note_key]
-                    timer.cancel()
-                    del self._active_note_timers[note_key]
-                if note_key in self._note_start_times:
-                    del self._note_start_times[note_key]
+            # Cancel the pending note-off if there is one
+            self._note_offs.cancel((midi_note, mask))
             
             # Send note-off messages
-            for channel in channels:
-                note_off_message = [0x80 + channel, midi_note, 0x40]
-                print(f"[MIDI] Sending NOTE_OFF: channel={channel+1}, note={midi_note}")
-                self.midi_out.send_message(note_off_message)
+            self._sender.send_batch(note_off_batch(midi_note, mask), _format_note_off, (mask, midi_note))
 
     def send_note(self, note: NoteObject, velocity: int, duration: float = 1.5) -> None:
         """Send a MIDI note with non-blocking note-off"""
         if self.midi_out:
-            midi_note = Note.notation_to_midi(note.notation + str(note.octave))
-            
-            # Determine which channels to send on
-            if self._midi_strum_channel is not None:
-                # Send on specific channel (channels are 1-16, but MIDI uses 0-15)
-                channels = [self._midi_strum_channel - 1]
-            else:
-                # Send on all channels (0-15)
-                channels = list(range(16))
-            
-            # Create unique key for this note+channels combination
-            note_key = (midi_note, tuple(channels))
-            
-            # Cancel any existing timer for this note to prevent premature note-off
-            with self._timer_lock:
-                if note_key in self._active_note_timers:
-                    old_timer = self._active_note_timers[note_key]
-                    old_timer.cancel()
-                    del self._active_note_timers[note_key]
-            
-            # Send note-on messages
-            for channel in channels:
-                note_on_message = [0x90 + channel, midi_note, velocity]
-                print(f"[MIDI] Sending NOTE_ON: channel={channel+1}, note={midi_note}, velocity={velocity}")
-                self.midi_out.send_message(note_on_message)
-            
-            # Track when this note started
-            with self._timer_lock:
-                self._note_start_times[note_key] = time.time()
-            
-            # Schedule note-off with a timer that can be cancelled
-            def send_note_off():
-                if self.midi_out:
-                    for channel in channels:
-                        note_off_message = [0x80 + channel, midi_note, 0x40]
-                        self.midi_out.send_message(note_off_message)
-                
-                # Remove this timer from active timers
-                with self._timer_lock:
-                    if note_key in self._active_note_timers:
-                        del self._active_note_timers[note_key]
-                    if note_key in self._note_start_times:
-                        del self._note_start_times[note_key]
-            
-            # Create and store the timer
-            timer = threading.Timer(duration, send_note_off)
-            timer.daemon = True  # Allow process to exit even if timer is running
-            with self._timer_lock:
-                self._active_note_timers[note_key] = timer
-            timer.start()
+            midi_note = note.midi
+            self._send_note_number(midi_note, velocity, self._channel_mask, duration, log=True)
     
     def send_raw_note(self, midi_note: int, velocity: int, channel: Optional[int] = None, duration: float = 1.5) -> None:
         """
@@ -255,90 +202,57 @@ class Midi(EventEmitter):
             duration: Duration in seconds before note-off
         """
         if self.midi_out:
-            # Determine which channel to send on
-            if channel is not None:
-                # Use provided channel (convert 1-16 to 0-15)
-                channels = [channel - 1]
-            elif self._midi_strum_channel is not None:
-                # Use configured strum channel (convert 1-16 to 0-15)
-                channels = [self._midi_strum_channel - 1]
-            else:
-                # Send on all channels (0-15)
-                channels = list(range(16))
-            
-            # Create unique key for this note+channels combination
-            note_key = (midi_note, tuple(channels))
-            
-            # Cancel any existing timer for this note to prevent premature note-off
-            with self._timer_lock:
-                if note_key in self._active_note_timers:
-                    old_timer = self._active_note_timers[note_key]
-                    old_timer.cancel()
-                    del self._active_note_timers[note_key]
-            
-            # Send note-on messages
-            for ch in channels:
-                note_on_message = [0x90 + ch, midi_note, velocity]
-                self.midi_out.send_message(note_on_message)
-            
-            # Track when this note started
-            with self._timer_lock:
-                self._note_start_times[note_key] = time.time()
-            
-            # Schedule note-off with a timer that can be cancelled
-            def send_note_off():
-                if self.midi_out:
-                    for ch in channels:
-                        note_off_message = [0x80 + ch, midi_note, 0x40]
-                        self.midi_out.send_message(note_off_message)
-                
-                # Remove this timer from active timers
-                with self._timer_lock:
-                    if note_key in self._active_note_timers:
-                        del self._active_note_timers[note_key]
-                    if note_key in self._note_start_times:
-                        del self._note_start_times[note_key]
-            
-            timer = threading.Timer(duration, send_note_off)
-            timer.daemon = True
-            
-            # Store timer to allow cancellation
-            with self._timer_lock:
-                self._active_note_timers[note_key] = timer
-            
-            timer.start()
+            # Use the provided channel, otherwise the strum channel(s)
+            mask = channel_mask(channel) if channel is not None else self._channel_mask
+            self._send_note_number(midi_note, velocity, mask, duration)
+
+    def _send_note_number(self, midi_note: int, velocity: int, mask: int, duration: float,
+                          log: bool = False) -> None:
+        """
+        Send note-ons on every channel in a mask and schedule the matching note-offs
+        
+        Args:
+            midi_note: MIDI note number (0-127)
+            velocity: MIDI velocity (0-127)
+            mask: Channel mask
+            duration: Duration in seconds before note-off
+            log: Print a line once the note-ons are sent
+        """
+        # Unique key for this note+channels combination
+        note_key = (midi_note, mask)
+        
+        # Cancel any pending note-off for this note to prevent premature note-off
+        self._note_offs.cancel(note_key)
+        
+        # Send note-on messages
+        self._sender.send_batch(note_on_batch(midi_note, velocity, mask), _format_note_on if log else None,
+                                (mask, midi_note, velocity))
+        
+        # Schedule note-off; it can be cancelled or replaced by a retrigger
+        off_batch = note_off_batch(midi_note, mask)
+        self._note_offs.schedule(note_key, duration, lambda: self._sender.send_batch(off_batch))
 
     def on_note_down(self, notation: str, octave: int) -> None:
         """Handle note down event"""
-        note_str = notation + str(octave)
-        if note_str not in self._notes:
-            self._notes.append(note_str)
-            self._notes = Note.sort(self._notes)
-            
-            # Emit event with proper event object
-            self.emit(
-                NOTE_EVENT,
-                MidiNoteEvent(
-                    notes=self._notes.copy(),
-                    added=note_str
-                )
-            )
+        self._press_note((octave + 1) * 12 + Note.index_of_notation(notation))
 
     def on_note_up(self, notation: str, octave: int) -> None:
         """Handle note up event"""
-        note_str = notation + str(octave)
-        if note_str in self._notes:
-            self._notes.remove(note_str)
-            self._notes = Note.sort(self._notes)
-            
-            # Emit event with proper event object
-            self.emit(
-                NOTE_EVENT,
-                MidiNoteEvent(
-                    notes=self._notes.copy(),
-                    removed=note_str
-                )
-            )
+        self._release_note((octave + 1) * 12 + Note.index_of_notation(notation))
+
+    def _press_note(self, midi_note: int) -> None:
+        """Mark an input note as held and emit a note event if it was not already"""
+        bit = 1 << midi_note
+        if not self._held_notes & bit:
+            self._held_notes |= bit
+            self.emit(NOTE_EVENT, MidiNoteEvent(note_mask=self._held_notes, added_note=midi_note))
+
+    def _release_note(self, midi_note: int) -> None:
+        """Mark an input note as released and emit a note event if it was held"""
+        bit = 1 << midi_note
+        if self._held_notes & bit:
+            self._held_notes &= ~bit
+            self.emit(NOTE_EVENT, MidiNoteEvent(note_mask=self._held_notes, removed_note=midi_note))
 
     def choose_input(self, input_id: str) -> None:
         """Choose MIDI input by ID (can be port index or port name)"""
@@ -373,12 +287,14 @@ class Midi(EventEmitter):
 
     def close(self) -> None:
         """Close MIDI connections"""
-        # Cancel all active note timers
-        with self._timer_lock:
-            for timer in self._active_note_timers.values():
-                timer.cancel()
-            self._active_note_timers.clear()
-            self._note_start_times.clear()
+        # Cancel all pending note-offs and stop the scheduler thread
+        self._note_offs.stop()
+        
+        # Write whatever is still queued before closing the port
+        self._sender.stop()
+        stats = self._sender.get_stats()
+        print(f"[MIDI] Output: {stats['messagesSent']} messages sent, max queue depth {stats['maxDepth']}, "
+              f"mean latency {stats['meanLatencyMs']:.2f} ms, max {stats['maxLatencyMs']:.2f} ms")
         
         if self.midi_out:
             self.midi_out.close_port()
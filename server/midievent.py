@@ -1,10 +1,35 @@
 """
 Pythonic MIDI event definitions using dataclasses.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 
+# MIDI input note names by note number (60 = 'C4'), as the MIDI backends have always named them
+_SHARP_NOTATIONS = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+MIDI_NOTE_NAMES = tuple(_SHARP_NOTATIONS[n % 12] + str(n // 12 - 1) for n in range(128))
+
+
+def midi_note_name(midi_note: int) -> str:
+    """Get the name of a MIDI input note number (e.g. 60 -> 'C4')"""
+    return MIDI_NOTE_NAMES[midi_note]
+
+
+def held_note_numbers(note_mask: int) -> List[int]:
+    """
+    Get the note numbers in a held-note bitmask, lowest first
+
+    Args:
+        note_mask: 128-bit mask with bit n set while MIDI note n is held
+    """
+    numbers = []
+    while note_mask:
+        lowest = note_mask & -note_mask
+        numbers.append(lowest.bit_length() - 1)
+        note_mask ^= lowest
+    return numbers
+
+
 @dataclass
 class MidiConnectionEvent:
     """Event fired when MIDI connection status changes."""
@@ -15,13 +40,40 @@ class MidiConnectionEvent:
 
 @dataclass  
 class MidiNoteEvent:
-    """Event fired when MIDI notes change."""
-    notes: List[str]  # List of active note strings like ['C4', 'E4', 'G4']
-    added: Optional[str] = None  # Note that was just added (if any)
-    removed: Optional[str] = None  # Note that was just removed (if any)
+    """
+    Event fired when MIDI notes change.
+
+    Carries the held notes as a bitmask and the changed note as a MIDI number;
+    the note name views are only built if a listener asks for them.
+    """
+    note_mask: int  # Bit n set while MIDI note n is held
+    added_note: Optional[int] = None  # MIDI number of the note that was just added (if any)
+    removed_note: Optional[int] = None  # MIDI number of the note that was just removed (if any)
+    _note_numbers: Optional[List[int]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def note_numbers(self) -> List[int]:
+        """MIDI numbers of the held notes, lowest first"""
+        if self._note_numbers is None:
+            self._note_numbers = held_note_numbers(self.note_mask)
+        return self._note_numbers
+
+    @property
+    def notes(self) -> List[str]:
+        """Held note names like ['C4', 'E4', 'G4'], lowest first"""
+        return [MIDI_NOTE_NAMES[n] for n in self.note_numbers]
+
+    @property
+    def added(self) -> Optional[str]:
+        """Name of the note that was just added (if any)"""
+        return None if self.added_note is None else MIDI_NOTE_NAMES[self.added_note]
+
+    @property
+    def removed(self) -> Optional[str]:
+        """Name of the note that was just removed (if any)"""
+        return None if self.removed_note is None else MIDI_NOTE_NAMES[self.removed_note]
 
 
 # Event type constants
 NOTE_EVENT = 'note'
 CONNECTION_EVENT = 'connection'
-
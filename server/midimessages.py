@@ -0,0 +1,92 @@
+"""
+MIDI Message Templates
+
+Channel masks and pre-encoded message batches shared by the MIDI backends.
+A channel mask has bit n set for MIDI channel n (0-15), so "all channels"
+and "channel 3" are both a single int. Note-on/note-off/pitch-bend batches
+are built once per (note, value, mask) and reused, so a strum costs a few
+cache lookups instead of building a list per message.
+"""
+
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+ALL_CHANNELS = 0xFFFF
+
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+CONTROL_CHANGE = 0xB0
+PITCH_BEND = 0xE0
+NOTE_OFF_VELOCITY = 0x40
+
+# Channel mode controllers that silence notes
+ALL_SOUND_OFF = 120
+ALL_NOTES_OFF = 123
+
+# A batch of encoded messages, one per channel in the mask
+MessageBatch = Tuple[bytes, ...]
+
+
+def channel_mask(channel: Optional[int]) -> int:
+    """
+    Get the channel mask for a configured channel
+
+    Args:
+        channel: MIDI channel (1-16), or None for all channels
+
+    Returns:
+        Bitmask of MIDI channels (bit 0 = channel 1)
+    """
+    if channel is None:
+        return ALL_CHANNELS
+    return 1 << (channel - 1)
+
+
+@lru_cache(maxsize=None)
+def mask_channels(mask: int) -> Tuple[int, ...]:
+    """Get the 0-based channel numbers in a mask, lowest first"""
+    return tuple(channel for channel in range(16) if mask & (1 << channel))
+
+
+@lru_cache(maxsize=4096)
+def note_on_batch(midi_note: int, velocity: int, mask: int) -> MessageBatch:
+    """Get note-on messages for a note on every channel in a mask"""
+    return tuple(bytes((NOTE_ON | channel, midi_note, velocity)) for channel in mask_channels(mask))
+
+
+@lru_cache(maxsize=1024)
+def note_off_batch(midi_note: int, mask: int) -> MessageBatch:
+    """Get note-off messages for a note on every channel in a mask"""
+    return tuple(bytes((NOTE_OFF | channel, midi_note, NOTE_OFF_VELOCITY)) for channel in mask_channels(mask))
+
+
+@lru_cache(maxsize=1024)
+def pitch_bend_batch(midi_bend: int, mask: int) -> MessageBatch:
+    """
+    Get pitch bend messages for every channel in a mask
+
+    Args:
+        midi_bend: 14-bit pitch bend value (0-16383, center is 8192)
+        mask: Channel mask
+    """
+    lsb = midi_bend & 0x7F
+    msb = (midi_bend >> 7) & 0x7F
+    return tuple(bytes((PITCH_BEND | channel, lsb, msb)) for channel in mask_channels(mask))
+
+
+def is_note_release(message: bytes) -> bool:
+    """Check whether a message ends notes (note-off, note-on with velocity 0, all sound/notes off)"""
+    status = message[0] & 0xF0
+    if status == NOTE_OFF:
+        return True
+    if status == NOTE_ON:
+        return message[2] == 0
+    return status == CONTROL_CHANGE and message[1] in (ALL_SOUND_OFF, ALL_NOTES_OFF)
+
+
+def describe_mask(mask: int) -> str:
+    """Format a channel mask for logging (1-based channel numbers)"""
+    if mask == ALL_CHANNELS:
+        return 'all'
+    return ','.join(str(channel + 1) for channel in mask_channels(mask))
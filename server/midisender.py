@@ -0,0 +1,152 @@
+"""
+MIDI Sender Thread
+
+Decouples MIDI output from the threads that produce it. Producers append a
+batch of messages to a queue and return immediately; a dedicated sender
+thread writes each batch back-to-back to the output port. A slow MIDI driver
+or a blocked stdout then delays only the sender, never input processing.
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Optional, Sequence, Tuple
+
+
+# Builds a log line from the arguments queued with a batch
+LogFormatter = Callable[..., str]
+
+# A queued batch: (enqueue time in ns, messages, optional log formatter, its arguments)
+Batch = Tuple[int, Sequence[Sequence[int]], Optional[LogFormatter], Tuple[Any, ...]]
+
+
+class MidiSender:
+    """
+    Writes queued MIDI message batches on a dedicated thread.
+
+    send_batch() may be called from any thread. The queue is a deque, whose
+    append and popleft are atomic, so producers never wait on the sender.
+    Batches queued before start() are written once the thread starts.
+    """
+
+    def __init__(self, write: Callable[[Sequence[int]], None], name: str = 'MidiSender'):
+        """
+        Args:
+            write: Writes one MIDI message to the output (e.g. MidiOut.send_message)
+            name: Name of the sender thread
+        """
+        self.write = write
+        self.name = name
+        self._queue: Deque[Batch] = deque()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.is_running = False
+
+        # Statistics
+        self.messages_sent = 0
+        self.batches_sent = 0
+        self.max_depth = 0
+        self.total_latency_ns = 0
+        self.max_latency_ns = 0
+
+    def send_batch(self, messages: Sequence[Sequence[int]], log: Optional[LogFormatter] = None,
+                   log_args: Tuple[Any, ...] = ()) -> None:
+        """
+        Queue messages that belong together (e.g. one note on every channel)
+
+        Args:
+            messages: MIDI messages, written in order without interleaving other batches
+            log: Optional function that builds a line to print once the batch has been
+                written; it is called with log_args on the sender thread, so the caller
+                never pays for formatting
+            log_args: Arguments for log
+        """
+        if not messages:
+            return
+        self._queue.append((time.monotonic_ns(), messages, log, log_args))
+        depth = len(self._queue)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._wake.set()
+
+    def send(self, message: Sequence[int]) -> None:
+        """
+        Queue a single message
+
+        Args:
+            message: MIDI message bytes
+        """
+        self.send_batch((message,))
+
+    @property
+    def depth(self) -> int:
+        """Number of batches waiting to be written"""
+        return len(self._queue)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get sender statistics
+
+        Returns:
+            Dictionary with queue depth, counts and enqueue-to-write latency in milliseconds
+        """
+        mean_ns = self.total_latency_ns / self.batches_sent if self.batches_sent else 0.0
+        return {
+            'depth': len(self._queue),
+            'maxDepth': self.max_depth,
+            'messagesSent': self.messages_sent,
+            'batchesSent': self.batches_sent,
+            'meanLatencyMs': mean_ns / 1e6,
+            'maxLatencyMs': self.max_latency_ns / 1e6
+        }
+
+    def start(self) -> None:
+        """Start the sender thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """
+        Write everything still queued, then stop the sender thread
+
+        Args:
+            timeout: Maximum time to wait for the thread to exit (seconds)
+        """
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        """Sender thread: write batches in the order they were queued"""
+        queue = self._queue
+        while True:
+            self._wake.wait()
+            # Clear before draining: anything queued from now on sets it again
+            self._wake.clear()
+
+            while queue:
+                enqueued_ns, messages, log, log_args = queue.popleft()
+                latency_ns = time.monotonic_ns() - enqueued_ns
+                try:
+                    for message in messages:
+                        self.write(message)
+                except Exception as e:
+                    print(f"[{self.name}] Error sending MIDI: {e}")
+                    continue
+                self.messages_sent += len(messages)
+                self.batches_sent += 1
+                self.total_latency_ns += latency_ns
+                if latency_ns > self.max_latency_ns:
+                    self.max_latency_ns = latency_ns
+                if log is not None:
+                    print(log(*log_args))
+
+            if not self.is_running:
+                break
@@ -1,49 +1,116 @@
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
 import math
 import json
 import os
 
 
-@dataclass
-class NoteObject:
-    notation: str
-    octave: int
-    secondary: bool = False
+# Semitone index of every sharp and flat notation ("Db" and "C#" are both 1)
+_SHARP_NOTATIONS = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+_FLAT_NOTATIONS = ("C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B")
+_NOTATION_INDEX: Dict[str, int] = {
+    **{notation: index for index, notation in enumerate(_FLAT_NOTATIONS)},
+    **{notation: index for index, notation in enumerate(_SHARP_NOTATIONS)}
+}
+
+# Chord intervals (semitones from root) by chord type
+CHORD_INTERVALS: Dict[str, Tuple[int, ...]] = {
+    # Triads
+    'maj': (0, 4, 7),           # Major triad
+    'min': (0, 3, 7),           # Minor triad
+    'm': (0, 3, 7),             # Minor triad (short form)
+    'dim': (0, 3, 6),           # Diminished triad
+    'aug': (0, 4, 8),           # Augmented triad
+    'sus2': (0, 2, 7),          # Suspended 2nd
+    'sus4': (0, 5, 7),          # Suspended 4th
+    '5': (0, 7),                # Power chord (root + fifth)
+    
+    # Seventh chords
+    '7': (0, 4, 7, 10),         # Dominant 7th
+    'maj7': (0, 4, 7, 11),      # Major 7th
+    'min7': (0, 3, 7, 10),      # Minor 7th
+    'm7': (0, 3, 7, 10),        # Minor 7th (short form)
+    'dim7': (0, 3, 6, 9),       # Diminished 7th
+    'aug7': (0, 4, 8, 10),      # Augmented 7th
+    'maj9': (0, 4, 7, 11, 14),  # Major 9th
+    'min9': (0, 3, 7, 10, 14),  # Minor 9th
+    'm9': (0, 3, 7, 10, 14),    # Minor 9th (short form)
+    '9': (0, 4, 7, 10, 14),     # Dominant 9th
     
+    # Extended chords
+    'add9': (0, 4, 7, 14),      # Major add 9
+    '6': (0, 4, 7, 9),          # Major 6th
+    'min6': (0, 3, 7, 9),       # Minor 6th
+    'm6': (0, 3, 7, 9),         # Minor 6th (short form)
+}
+
+# Every NoteObject ever created, keyed by (notation, octave, secondary)
+_interned: Dict[Tuple[str, int, bool], 'NoteObject'] = {}
+
+
+class NoteObject:
+    """
+    An immutable note. Equal notes are the same object: NoteObject(...) returns
+    the interned instance, so notes can be compared, hashed and shared freely.
+
+    Attributes:
+        notation: Note name as given (e.g. 'C#' or 'Db')
+        octave: Octave number
+        secondary: True for notes added by the note spread
+        midi: Note number as Note.notation_to_midi computes it (octave * 12 + semitone)
+        frequency: Frequency as Note.get_frequency_for_notation computes it, or None for an unknown notation
+    """
+    __slots__ = ('notation', 'octave', 'secondary', 'midi', 'frequency')
+
+    def __new__(cls, notation: str, octave: int, secondary: bool = False) -> 'NoteObject':
+        key = (notation, octave, secondary)
+        note = _interned.get(key)
+        if note is None:
+            note = object.__new__(cls)
+            index = _NOTATION_INDEX.get(notation)
+            set_slot = object.__setattr__
+            set_slot(note, 'notation', notation)
+            set_slot(note, 'octave', octave)
+            set_slot(note, 'secondary', secondary)
+            set_slot(note, 'midi', octave * 12 + (index or 0))
+            set_slot(note, 'frequency', None if index is None else 440 * (2 ** ((index + (octave - 4) * 12) / 12)))
+            _interned[key] = note
+        return note
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"NoteObject is immutable (cannot set '{name}')")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"NoteObject is immutable (cannot delete '{name}')")
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, NoteObject):
+            return NotImplemented
+        return (self.notation, self.octave, self.secondary) == (other.notation, other.octave, other.secondary)
+
+    def __hash__(self) -> int:
+        return hash((self.notation, self.octave, self.secondary))
+
+    def __repr__(self) -> str:
+        return f"NoteObject(notation={self.notation!r}, octave={self.octave!r}, secondary={self.secondary!r})"
+
+    def __reduce__(self):
+        return (NoteObject, (self.notation, self.octave, self.secondary))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the note as a JSON-serializable dict (NoteObject(**note.to_dict()) == note)"""
+        return {'notation': self.notation, 'octave': self.octave, 'secondary': self.secondary}
+
     def transpose(self, semitones: int) -> 'NoteObject':
         """Transpose the note by a given number of semitones"""
         if semitones == 0:
             return self
         
-        # Convert to MIDI note number
-        from note import Note
-        try:
-            note_index = Note.sharp_notations.index(self.notation)
-        except ValueError:
-            try:
-                note_index = Note.flat_notations.index(self.notation)
-            except ValueError:
-                note_index = 0
-        
-        midi_number = self.octave * 12 + note_index
-        
-        # Add semitones
-        transposed_midi = midi_number + semitones
-        
-        # Convert back to notation and octave
-        new_octave = transposed_midi // 12
-        new_note_index = transposed_midi % 12
-        
         # Prefer to use the same notation style (sharp vs flat) as the original
-        if '#' in self.notation:
-            new_notation = Note.sharp_notations[new_note_index]
-        elif 'b' in self.notation:
-            new_notation = Note.flat_notations[new_note_index]
-        else:
-            new_notation = Note.sharp_notations[new_note_index]
-        
-        return NoteObject(notation=new_notation, octave=new_octave, secondary=self.secondary)
+        prefer_flat = '#' not in self.notation and 'b' in self.notation
+        return Note.from_midi(self.midi + semitones, prefer_flat, self.secondary)
 
 
 class Note:
@@ -71,6 +138,14 @@ class Note:
     
     # Track if progressions have been loaded
     _progressions_loaded = False
+    
+    # Non-secondary notes for note numbers 0-127 (see NoteObject.midi), sharp and flat spellings
+    midi_notes: Tuple[NoteObject, ...] = tuple(
+        NoteObject(_SHARP_NOTATIONS[n % 12], n // 12) for n in range(128)
+    )
+    midi_notes_flat: Tuple[NoteObject, ...] = tuple(
+        NoteObject(_FLAT_NOTATIONS[n % 12], n // 12) for n in range(128)
+    )
 
     @classmethod
     def load_chord_progressions(cls) -> None:
@@ -113,13 +188,22 @@ class Note:
     @classmethod
     def index_of_notation(cls, notation: str) -> int:
         """Get notation index when notation is either flat or sharp"""
-        try:
-            return cls.sharp_notations.index(notation)
-        except ValueError:
-            try:
-                return cls.flat_notations.index(notation)
-            except ValueError:
-                return -1
+        return _NOTATION_INDEX.get(notation, -1)
+
+    @classmethod
+    def from_midi(cls, midi_number: int, prefer_flat: bool = False, secondary: bool = False) -> NoteObject:
+        """
+        Get the note for a note number
+        
+        Args:
+            midi_number: Note number as NoteObject.midi counts it (octave * 12 + semitone)
+            prefer_flat: Spell accidentals as flats instead of sharps
+            secondary: Whether the note is part of the note spread
+        """
+        if 0 <= midi_number < 128 and not secondary:
+            return (cls.midi_notes_flat if prefer_flat else cls.midi_notes)[midi_number]
+        notations = _FLAT_NOTATIONS if prefer_flat else _SHARP_NOTATIONS
+        return NoteObject(notations[midi_number % 12], midi_number // 12, secondary)
 
     @classmethod
     def notation_at_index(cls, index: int, prefer_flat: bool = False) -> str:
@@ -141,15 +225,7 @@ class Note:
     @classmethod
     def notation_to_midi(cls, notation: str) -> int:
         """Translate notation and octave to MIDI index"""
-        nt_obj = cls.parse_notation(notation)
-        try:
-            nt_indx = cls.sharp_notations.index(nt_obj.notation)
-        except ValueError:
-            try:
-                nt_indx = cls.flat_notations.index(nt_obj.notation)
-            except ValueError:
-                nt_indx = 0
-        return nt_obj.octave * len(cls.sharp_notations) + nt_indx
+        return cls.parse_notation(notation).midi
 
     @classmethod
     def sort(cls, notes: List[str]) -> List[str]:
@@ -157,30 +233,14 @@ class Note:
         def sort_key(note: str):
             octave = int(note[-1]) if note[-1].isdigit() else 4
             notation = note[:-1] if note[-1].isdigit() else note
-            try:
-                notation_index = cls.sharp_notations.index(notation)
-            except ValueError:
-                notation_index = 0
-            return (octave, notation_index)
+            return (octave, _SHARP_NOTATIONS.index(notation) if notation in _SHARP_NOTATIONS else 0)
         
         return sorted(notes, key=sort_key)
 
     @classmethod
     def parse_notation(cls, notation: str) -> NoteObject:
         """Parse notation to notation and octave"""
-        # Only supports one digit octaves
-        octave_char = notation[-1]
-        if octave_char.isdigit():
-            octave = int(octave_char)
-            if len(notation) == 3:
-                note_notation = notation[:2]
-            else:
-                note_notation = notation[0]
-        else:
-            octave = 4  # default
-            note_notation = notation
-        
-        return NoteObject(notation=note_notation, octave=octave)
+        return _parse_notation(notation)
 
     @classmethod
     def get_frequency_for_notation(cls, nt: str) -> Optional[float]:
@@ -276,37 +336,34 @@ class Note:
         Returns:
             List of NoteObject instances representing the chord
         """
-        # Define chord intervals (semitones from root)
-        chord_intervals = {
-            # Triads
-            'maj': [0, 4, 7],           # Major triad
-            'min': [0, 3, 7],           # Minor triad
-            'm': [0, 3, 7],             # Minor triad (short form)
-            'dim': [0, 3, 6],           # Diminished triad
-            'aug': [0, 4, 8],           # Augmented triad
-            'sus2': [0, 2, 7],          # Suspended 2nd
-            'sus4': [0, 5, 7],          # Suspended 4th
-            '5': [0, 7],                # Power chord (root + fifth)
-            
-            # Seventh chords
-            '7': [0, 4, 7, 10],         # Dominant 7th
-            'maj7': [0, 4, 7, 11],      # Major 7th
-            'min7': [0, 3, 7, 10],      # Minor 7th
-            'm7': [0, 3, 7, 10],        # Minor 7th (short form)
-            'dim7': [0, 3, 6, 9],       # Diminished 7th
-            'aug7': [0, 4, 8, 10],      # Augmented 7th
-            'maj9': [0, 4, 7, 11, 14],  # Major 9th
-            'min9': [0, 3, 7, 10, 14],  # Minor 9th
-            'm9': [0, 3, 7, 10, 14],    # Minor 9th (short form)
-            '9': [0, 4, 7, 10, 14],     # Dominant 9th
-            
-            # Extended chords
-            'add9': [0, 4, 7, 14],      # Major add 9
-            '6': [0, 4, 7, 9],          # Major 6th
-            'min6': [0, 3, 7, 9],       # Minor 6th
-            'm6': [0, 3, 7, 9],         # Minor 6th (short form)
-        }
+        return list(_chord_voicing(chord_notation, octave))
+    
+    @classmethod
+    def chord_strings(cls, chord_notation: str, octave: int = 4, lower_spread: int = 0,
+                      upper_spread: int = 0) -> Tuple[NoteObject, ...]:
+        """
+        Get the strings for a chord: its voicing with the note spread filled in.
+        Results are cached, so switching between chords does not rebuild them.
         
+        Args:
+            chord_notation: Chord notation (e.g., "C", "Gm", "Am7")
+            octave: Base octave for the root note
+            lower_spread: Number of notes added below the chord
+            upper_spread: Number of notes added above the chord
+            
+        Returns:
+            Tuple of NoteObject instances, lowest string first
+        """
+        return _note_spread(_chord_voicing(chord_notation, octave), lower_spread, upper_spread)
+    
+    @classmethod
+    def note_spread(cls, notes: List[NoteObject], lower_spread: int = 0, upper_spread: int = 0) -> Tuple[NoteObject, ...]:
+        """Cached fill_note_spread() for notes that are reused (e.g. button presets)"""
+        return _note_spread(tuple(notes), lower_spread, upper_spread)
+    
+    @classmethod
+    def _build_chord(cls, chord_notation: str, octave: int) -> List[NoteObject]:
+        """Build a chord voicing (see parse_chord)"""
         # Parse the root note and chord type
         # Extract root note (first 1-2 characters)
         if len(chord_notation) >= 2 and chord_notation[1] in ['#', 'b']:
@@ -321,11 +378,11 @@ class Note:
             chord_type = 'maj'
         
         # Get the intervals for this chord type
-        intervals = chord_intervals.get(chord_type)
+        intervals = CHORD_INTERVALS.get(chord_type)
         if intervals is None:
             # Unknown chord type, default to major triad
             print(f"[NOTE] Unknown chord type '{chord_type}', defaulting to major triad")
-            intervals = chord_intervals['maj']
+            intervals = CHORD_INTERVALS['maj']
         
         # Parse the root note
         root_note = cls.parse_notation(root + str(octave))
@@ -373,3 +430,32 @@ class Note:
         
         return [*lower, *notes, *upper]
 
+
+@lru_cache(maxsize=1024)
+def _parse_notation(notation: str) -> NoteObject:
+    """Parse notation to notation and octave (notes are immutable, so results are shared)"""
+    # Only supports one digit octaves
+    octave_char = notation[-1]
+    if octave_char.isdigit():
+        octave = int(octave_char)
+        if len(notation) == 3:
+            note_notation = notation[:2]
+        else:
+            note_notation = notation[0]
+    else:
+        octave = 4  # default
+        note_notation = notation
+    
+    return NoteObject(notation=note_notation, octave=octave)
+
+
+@lru_cache(maxsize=512)
+def _chord_voicing(chord_notation: str, octave: int) -> Tuple[NoteObject, ...]:
+    """Cached chord voicing (see Note.parse_chord)"""
+    return tuple(Note._build_chord(chord_notation, octave))
+
+
+@lru_cache(maxsize=512)
+def _note_spread(notes: Tuple[NoteObject, ...], lower_spread: int, upper_spread: int) -> Tuple[NoteObject, ...]:
+    """Cached note spread (see Note.fill_note_spread)"""
+    return tuple(Note.fill_note_spread(list(notes), lower_spread, upper_spread))
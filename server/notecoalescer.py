@@ -0,0 +1,85 @@
+"""
+MIDI Input Note Coalescer
+
+A chord played on a MIDI keyboard arrives as several note events a few
+milliseconds apart, and each one used to rebuild the strummer notes and
+broadcast them. Every note event carries the complete set of held notes, so
+only the last event of a burst matters: the coalescer holds events for a
+short window after the first one and then delivers just the latest.
+"""
+
+import time
+from typing import Callable, Optional
+
+from midievent import MidiNoteEvent
+
+
+# Default time a burst of note events is collected for (seconds)
+DEFAULT_WINDOW = 0.008
+
+
+class NoteEventCoalescer:
+    """
+    Delivers the latest MIDI note event of each burst.
+
+    Implements the engine timer interface: next_deadline() and fire(now_ns).
+    All methods are called on the engine thread. The window starts at the
+    first event of a burst and is not extended by later ones, so a note change
+    is never delayed by more than one window.
+    """
+
+    def __init__(self, deliver: Callable[[MidiNoteEvent], None], window: float = DEFAULT_WINDOW):
+        """
+        Args:
+            deliver: Called with the latest event once the window closes
+            window: Time to collect events for (seconds); 0 delivers every event immediately
+        """
+        self.deliver = deliver
+        self.window_ns = max(0, int(window * 1e9))
+        self._pending: Optional[MidiNoteEvent] = None
+        self._deadline_ns: Optional[int] = None
+
+        # Statistics
+        self.received = 0
+        self.delivered = 0
+
+    def push(self, event: MidiNoteEvent) -> None:
+        """
+        Add a note event to the current burst
+
+        Args:
+            event: Note event from the MIDI backend
+        """
+        self.received += 1
+        if self.window_ns <= 0:
+            self.delivered += 1
+            self.deliver(event)
+            return
+        self._pending = event
+        if self._deadline_ns is None:
+            self._deadline_ns = time.monotonic_ns() + self.window_ns
+
+    def next_deadline(self) -> Optional[int]:
+        """
+        Get the time the current burst is delivered
+
+        Returns:
+            time.monotonic_ns() when the window closes, or None if no event is waiting
+        """
+        return self._deadline_ns
+
+    def fire(self, now_ns: int) -> None:
+        """
+        Deliver the latest event if the window has closed
+
+        Args:
+            now_ns: Current time.monotonic_ns()
+        """
+        if self._deadline_ns is None or now_ns < self._deadline_ns:
+            return
+        event = self._pending
+        self._pending = None
+        self._deadline_ns = None
+        if event is not None:
+            self.delivered += 1
+            self.deliver(event)
@@ -0,0 +1,146 @@
+"""
+Note-Off Scheduler
+
+One thread and a min-heap of deadlines replace a threading.Timer (and OS
+thread) per note. Entries are keyed, so scheduling a key again replaces its
+pending callback and a key can be cancelled, e.g. when a note is retriggered
+or released early.
+"""
+
+import time
+import heapq
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+# Rebuild the heap when cancelled entries outnumber live ones by this factor
+_COMPACT_FACTOR = 2
+_COMPACT_MIN_SIZE = 64
+
+
+class NoteOffScheduler:
+    """
+    Runs keyed callbacks at a deadline on a single scheduler thread.
+
+    Inserting is O(log n). Cancelling is O(1): cancelled entries stay in the
+    heap and are skipped when they reach the top (the heap is compacted if
+    they pile up). Callbacks run on the scheduler thread, outside the lock.
+    """
+
+    def __init__(self, name: str = 'NoteOffScheduler'):
+        """
+        Args:
+            name: Name of the scheduler thread
+        """
+        self.name = name
+        self._heap: List[Tuple[int, int, Hashable, Callable[[], Any]]] = []
+        self._pending: Dict[Hashable, int] = {}  # key -> sequence number of its live entry
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.is_running = False
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], Any]) -> None:
+        """
+        Run a callback after a delay, replacing any callback pending for the same key
+
+        Args:
+            key: Identifies the entry, e.g. (midi_note, channels)
+            delay: Seconds from now
+            callback: Function to call with no arguments
+        """
+        deadline_ns = time.monotonic_ns() + int(delay * 1e9)
+        with self._condition:
+            if not self.is_running:
+                self._start_locked()
+            self._sequence += 1
+            self._pending[key] = self._sequence
+            heapq.heappush(self._heap, (deadline_ns, self._sequence, key, callback))
+            self._compact_locked()
+            # Only wake the thread if this entry is now the earliest
+            if self._heap[0][1] == self._sequence:
+                self._condition.notify()
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel the pending callback for a key
+
+        Args:
+            key: Key passed to schedule()
+
+        Returns:
+            True if a callback was pending
+        """
+        with self._condition:
+            return self._pending.pop(key, None) is not None
+
+    def cancel_all(self) -> None:
+        """Cancel every pending callback"""
+        with self._condition:
+            self._pending.clear()
+            self._heap.clear()
+
+    def is_pending(self, key: Hashable) -> bool:
+        """Check whether a callback is pending for a key"""
+        return key in self._pending
+
+    @property
+    def pending_count(self) -> int:
+        """Number of pending callbacks"""
+        return len(self._pending)
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """
+        Cancel everything and stop the scheduler thread
+
+        Args:
+            timeout: Maximum time to wait for the thread to exit (seconds)
+        """
+        with self._condition:
+            self._pending.clear()
+            self._heap.clear()
+            self.is_running = False
+            self._condition.notify()
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _start_locked(self) -> None:
+        """Start the scheduler thread (caller holds the lock)"""
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _compact_locked(self) -> None:
+        """Drop cancelled entries if they dominate the heap (caller holds the lock)"""
+        size = len(self._heap)
+        if size > _COMPACT_MIN_SIZE and size > _COMPACT_FACTOR * (len(self._pending) + 1):
+            pending = self._pending
+            self._heap = [entry for entry in self._heap if pending.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def _run(self) -> None:
+        """Scheduler thread: sleep until the earliest deadline and run due callbacks"""
+        while True:
+            due = []
+            with self._condition:
+                if not self.is_running:
+                    break
+                heap = self._heap
+                now_ns = time.monotonic_ns()
+                while heap and heap[0][0] <= now_ns:
+                    _, sequence, key, callback = heapq.heappop(heap)
+                    if self._pending.get(key) == sequence:
+                        del self._pending[key]
+                        due.append(callback)
+                if not due:
+                    timeout = (heap[0][0] - now_ns) / 1e9 if heap else None
+                    self._condition.wait(timeout)
+                    continue
+
+            for callback in due:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"[{self.name}] Error in scheduled callback: {e}")
@@ -0,0 +1,97 @@
+"""
+Note Repeater
+
+Repeats the last strummed notes at a fixed interval while the pen is held.
+Repeats are driven by the strum engine's timer, not by HID report arrival,
+so they stay on the beat regardless of the tablet's report rate and keep
+going if the tablet stops reporting while the pen is held down.
+"""
+
+from typing import Callable, List, Dict, Any, Optional
+
+
+class NoteRepeater:
+    """
+    Schedules note repeats for the strum engine.
+
+    Implements the engine timer interface: next_deadline() and fire(now_ns).
+    All methods are called on the engine thread.
+    """
+
+    def __init__(self):
+        self.notes: List[Dict[str, Any]] = []
+        self.is_holding = False
+        self.enabled = False
+        self.interval_ns = 0
+        self.velocity = 0
+        self.duration = 0.0
+        self.repeat_count = 0
+        self._last_repeat_ns = 0
+        self._play: Optional[Callable[[List[Dict[str, Any]], int, float], None]] = None
+
+    def start(self, notes: List[Dict[str, Any]], timestamp_ns: int,
+              play: Callable[[List[Dict[str, Any]], int, float], None]) -> None:
+        """
+        Start repeating notes that were just strummed
+
+        Args:
+            notes: Strummed notes (dicts with 'note' and 'velocity')
+            timestamp_ns: time.monotonic_ns() of the sample that strummed them
+            play: Called with (notes, velocity, duration) for every repeat
+        """
+        self.notes = notes
+        self.is_holding = True
+        self._last_repeat_ns = timestamp_ns
+        self._play = play
+
+    def stop(self) -> None:
+        """Stop repeating (pen released)"""
+        self.is_holding = False
+        self.notes = []
+
+    def update(self, enabled: bool, interval: float, velocity: int, duration: float) -> None:
+        """
+        Update the repeat parameters from the latest sample
+
+        Args:
+            enabled: Whether the repeater is active
+            interval: Time between repeats (seconds)
+            velocity: MIDI velocity for repeated notes
+            duration: Note duration for repeated notes (seconds)
+        """
+        self.enabled = enabled
+        self.interval_ns = int(interval * 1e9)
+        self.velocity = velocity
+        self.duration = duration
+
+    def next_deadline(self) -> Optional[int]:
+        """
+        Get the time of the next repeat
+
+        Returns:
+            time.monotonic_ns() of the next repeat, or None if nothing is scheduled
+        """
+        if not (self.enabled and self.is_holding and self.notes) or self.interval_ns <= 0:
+            return None
+        return self._last_repeat_ns + self.interval_ns
+
+    def fire(self, now_ns: int) -> None:
+        """
+        Play a repeat if one is due
+
+        Args:
+            now_ns: Current time.monotonic_ns()
+        """
+        deadline = self.next_deadline()
+        if deadline is None or now_ns < deadline:
+            return
+
+        if self.velocity > 0 and self._play is not None:
+            self._play(self.notes, self.velocity, self.duration)
+            self.repeat_count += 1
+
+        # Advance by whole intervals so repeats do not drift; if the engine fell
+        # more than an interval behind, resume from now instead of bursting
+        self._last_repeat_ns = deadline
+        if now_ns - deadline >= self.interval_ns:
+            self._last_repeat_ns = now_ns
@@ -1,21 +1,116 @@
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, NamedTuple, Optional, Dict, Any, Sequence, Tuple
+from bisect import bisect_right
+import json
+import threading
 import time
 from note import NoteObject
 from eventlistener import EventEmitter
+from datahelpers import apply_curve
+
+
+# Pressure-to-velocity tables have one entry per 1/1023 of pressure
+VELOCITY_TABLE_SIZE = 1024
+_VELOCITY_TABLE_MAX = VELOCITY_TABLE_SIZE - 1
+
+# Minimum velocity of a strummed note, for audibility
+MIN_VELOCITY = 20
+
+
+def build_velocity_table(curve: float = 1.0, pressure_threshold: float = 0.0) -> Tuple[int, ...]:
+    """
+    Build a pressure-to-MIDI-velocity lookup table
+    
+    Args:
+        curve: Response curve, as for datahelpers.apply_curve (1.0 = linear)
+        pressure_threshold: Pressure that maps to MIN_VELOCITY; the range above it
+            is stretched over MIN_VELOCITY-127. Use 0.0 to map pressure 0-1 onto 0-127
+            (floored at MIN_VELOCITY).
+    
+    Returns:
+        VELOCITY_TABLE_SIZE velocities, indexed by int(pressure * (VELOCITY_TABLE_SIZE - 1))
+    """
+    table = []
+    for i in range(VELOCITY_TABLE_SIZE):
+        pressure = i / _VELOCITY_TABLE_MAX
+        if 0 < pressure_threshold < 1.0:
+            normalized = (pressure - pressure_threshold) / (1.0 - pressure_threshold)
+            normalized = max(0.0, min(1.0, normalized))
+            velocity = int(MIN_VELOCITY + apply_curve(normalized, curve) * (127 - MIN_VELOCITY))
+        else:
+            velocity = int(apply_curve(pressure, curve) * 127)
+        table.append(max(MIN_VELOCITY, min(127, velocity)))
+    return tuple(table)
+
+
+class StrumLayout(NamedTuple):
+    """
+    Immutable snapshot of everything strum() needs to map a position to a string.
+    
+    Writers build a new snapshot and replace the reference in one assignment, so
+    strum() reads a consistent set of notes and bounds with a single attribute load.
+    """
+    notes: Tuple[NoteObject, ...]
+    base_notes: Tuple[NoteObject, ...]  # Notes that are not part of the spread
+    width: float
+    height: float
+    boundaries: Tuple[float, ...]  # x where each string but the last ends, ascending
+    dead_zone: float  # Width of the band around each boundary that belongs to no string
+    hysteresis: float  # Distance past a boundary needed to leave the current string
+    version: int  # Incremented whenever notes are replaced
+    
+    def string_at(self, x: float, current: int = -1) -> int:
+        """
+        Get the string under a position
+        
+        Args:
+            x: Normalized x position
+            current: String the pen is on (-1 if none)
+            
+        Returns:
+            String index, or -1 if x is in a dead zone and the pen is not on a string
+        """
+        boundaries = self.boundaries
+        index = bisect_right(boundaries, x)
+        margin = self.hysteresis + self.dead_zone / 2
+        if margin <= 0:
+            return index
+        
+        if current >= 0:
+            # Stay on the current string until x is clearly past its edge
+            if index > current and x < boundaries[current] + margin:
+                return current
+            if index < current and x >= boundaries[current - 1] - margin:
+                return current
+            return index
+        
+        half_dead_zone = self.dead_zone / 2
+        if half_dead_zone > 0:
+            if index > 0 and x - boundaries[index - 1] < half_dead_zone:
+                return -1
+            if index < len(boundaries) and boundaries[index] - x <= half_dead_zone:
+                return -1
+        return index
+
 
 class Strummer(EventEmitter):
     def __init__(self):
         super().__init__()
-        self._width: float = 1.0
-        self._height: float = 1.0
-        self._notes: List[NoteObject] = []
+        self._string_widths: Tuple[float, ...] = ()  # Relative string widths, from the left
+        self._primary_string_width: float = 1.0  # Relative width of strings that are not part of the spread
+        self._dead_zone: float = 0.0
+        self._hysteresis: float = 0.0
+        self._layout: StrumLayout = StrumLayout((), (), 1.0, 1.0, (), 0.0, 0.0, 0)
+        self._layout_lock = threading.Lock()  # Serializes writers; strum() never takes it
+        self._notes_state_cache: Optional[Tuple[int, Dict[str, Any], str]] = None  # (version, state, JSON)
         self.last_x: float = -1.0
         self.last_strummed_index: int = -1
         self.last_pressure: float = 0.0
-        self.last_timestamp: float = 0.0
+        self.last_timestamp: float = 0.0  # Monotonic seconds of the previous sample
         self.pressure_velocity: float = 0.0  # Rate of pressure change
         self.pressure_threshold: float = 0.1  # Minimum pressure to trigger a strum
-        self.velocity_scale: float = 4.0  # Scale factor for pressure velocity to MIDI velocity
+        self.velocity_curve: float = 1.0  # Response curve of pressure to velocity (1.0 = linear)
+        self._tap_velocities: Tuple[int, ...] = build_velocity_table(1.0, self.pressure_threshold)
+        self._strum_velocities: Tuple[int, ...] = build_velocity_table(1.0)
         self.last_strum_velocity: int = 0  # Last calculated velocity for release event
         
         # Pressure buffering for accurate velocity sensing on quick taps
@@ -24,45 +119,119 @@ class Strummer(EventEmitter):
         self.pending_tap_index: int = -1  # Index of pending tap waiting for buffer
 
     @property
-    def notes(self) -> List[NoteObject]:
-        return self._notes
+    def layout(self) -> StrumLayout:
+        """Current notes and bounds snapshot"""
+        return self._layout
+
+    @property
+    def notes(self) -> Tuple[NoteObject, ...]:
+        return self._layout.notes
 
     @notes.setter
-    def notes(self, notes: List[NoteObject]) -> None:
-        self._notes = notes
-        self.update_bounds(self._width, self._height)
+    def notes(self, notes: Sequence[NoteObject]) -> None:
+        notes = tuple(notes)
+        base_notes = tuple(note for note in notes if not note.secondary)
+        with self._layout_lock:
+            layout = self._layout
+            self._layout = self._build_layout(notes, base_notes, layout.width, layout.height, layout.version + 1)
         # Emit event when notes change
         self.emit('notes_changed')
     
+    @property
+    def base_notes(self) -> Tuple[NoteObject, ...]:
+        """Notes that are not part of the note spread (e.g. the chord or held MIDI notes)"""
+        return self._layout.base_notes
+    
+    def _build_layout(self, notes: Tuple[NoteObject, ...], base_notes: Tuple[NoteObject, ...], width: float,
+                      height: float, version: int) -> StrumLayout:
+        """Build a layout snapshot, precomputing the string boundaries"""
+        weights = []
+        for i, note in enumerate(notes):
+            weight = self._string_widths[i] if i < len(self._string_widths) else 1.0
+            if not note.secondary:
+                weight *= self._primary_string_width
+            weights.append(max(0.0, weight))
+        
+        total = sum(weights)
+        if total <= 0:
+            # No usable widths: fall back to evenly spaced strings
+            weights = [1.0] * len(notes)
+            total = float(len(notes))
+        
+        boundaries = []
+        edge = 0.0
+        for weight in weights[:-1]:
+            edge += weight
+            boundaries.append(width * edge / total)
+        return StrumLayout(notes, base_notes, width, height, tuple(boundaries), self._dead_zone * width,
+                           self._hysteresis * width, version)
+    
     def get_notes_state(self) -> Dict[str, Any]:
         """
         Get the current notes state as a dictionary for broadcasting.
         
+        The state is built once per notes change and shared, so callers must not modify it.
+        
         Returns:
-            Dictionary with type, notes, stringCount, baseNotes, and timestamp
+            Dictionary with type, notes, stringCount, baseNotes, and timestamp (when the notes were set)
         """
-        from dataclasses import asdict
-        import time
+        return self._get_notes_state_cache()[1]
+    
+    def get_notes_json(self) -> str:
+        """
+        Get the current notes state serialized as JSON, built once per notes change.
         
-        # Get base notes (non-secondary) as NoteObject instances for recalculation
-        base_notes = [note for note in self._notes if not note.secondary]
+        Returns:
+            JSON string of get_notes_state()
+        """
+        return self._get_notes_state_cache()[2]
+    
+    def _get_notes_state_cache(self) -> Tuple[int, Dict[str, Any], str]:
+        """Get the cached notes state, rebuilding it if the notes have changed"""
+        cache = self._notes_state_cache
+        layout = self._layout
+        if cache is not None and cache[0] == layout.version:
+            return cache
         
-        return {
+        notes = layout.notes
+        base_notes = layout.base_notes
+        state = {
             'type': 'notes',
-            'notes': [asdict(note) for note in self._notes],
-            'stringCount': len(self._notes),
-            'baseNotes': [asdict(note) for note in base_notes],
+            'notes': [note.to_dict() for note in notes],
+            'stringCount': len(notes),
+            'baseNotes': [note.to_dict() for note in base_notes],
             'timestamp': time.time()
         }
+        cache = (layout.version, state, json.dumps(state))
+        self._notes_state_cache = cache
+        return cache
 
-    def strum(self, x: float, pressure: float) -> Optional[Dict[str, Any]]:
-        """Process strumming input and return dict with type and notes/velocities if triggered"""
-        if len(self._notes) > 0:
-            string_width = self._width / len(self._notes)
-            index = min(int(x / string_width), len(self._notes) - 1)
+    def strum(self, x: float, pressure: float, timestamp_ns: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Process strumming input and return dict with type and notes/velocities if triggered
+        
+        Args:
+            x: Normalized x position (0-1)
+            pressure: Normalized pressure (0-1)
+            timestamp_ns: time.monotonic_ns() when the sample was read (defaults to now).
+                Passing the read time keeps pressure velocity correct when processing lags.
+        """
+        # Read the snapshot once: notes may be replaced by another thread mid-gesture
+        layout = self._layout
+        notes = layout.notes
+        string_count = len(notes)
+        if string_count > 0:
+            # Indices from a gesture that started on a layout with more strings
+            if self.last_strummed_index >= string_count:
+                self.last_strummed_index = string_count - 1
+            if self.pending_tap_index >= string_count:
+                self.pending_tap_index = string_count - 1
+            
+            current = self.pending_tap_index if self.pending_tap_index != -1 else self.last_strummed_index
+            index = layout.string_at(x, current)
             
             # Calculate time delta and pressure velocity
-            current_time = time.time()
+            current_time = (timestamp_ns if timestamp_ns is not None else time.monotonic_ns()) / 1e9
             time_delta = current_time - self.last_timestamp if self.last_timestamp > 0 else 0.001
             
             # Calculate pressure velocity (rate of change)
@@ -95,7 +264,13 @@ class Strummer(EventEmitter):
                     return {'type': 'release', 'velocity': release_velocity}
                 
                 return None
-            
+
+            # Between strings with none held: leave the pressure state alone so a tap
+            # that lands in the dead zone starts once the pen reaches a string
+            if index == -1:
+                self.last_x = x
+                return None
+
             # Handle new tap - start buffering
             if pressure_down and (self.last_strummed_index == -1 or self.last_strummed_index != index):
                 # Include the previous pressure (before threshold) to capture the initial velocity spike
@@ -131,31 +306,23 @@ class Strummer(EventEmitter):
                 if len(self.pressure_buffer) >= self.buffer_max_samples:
                     # Use current pressure as the main velocity indicator
                     # This is more intuitive - harder press = louder note
-                    # Map pressure (0.0-1.0) to MIDI velocity (20-127)
                     # Pressure at trigger point is a better indicator than rate of change
-                    current_pressure = pressure
-                    
-                    # Apply velocity scaling and map to MIDI range
-                    # Pressure range: 0.1 (threshold) to 1.0 → Velocity: 20 to 127
-                    normalized_pressure = (current_pressure - self.pressure_threshold) / (1.0 - self.pressure_threshold)
-                    normalized_pressure = max(0.0, min(1.0, normalized_pressure))
-                    
-                    # Scale to velocity range (20-127)
-                    midi_velocity = int(20 + normalized_pressure * 107)
-                    midi_velocity = max(20, min(127, midi_velocity))
+                    # Pressure range: threshold to 1.0 → Velocity: 20 to 127, through the velocity curve
+                    midi_velocity = self._tap_velocities[min(int(pressure * _VELOCITY_TABLE_MAX), _VELOCITY_TABLE_MAX)]
                     
                     # Debug logging for velocity calculation (disabled for cleaner logs)
-                    # print(f"[STRUM] Pressure: {current_pressure:.4f}, Normalized: {normalized_pressure:.4f}, MIDI velocity: {midi_velocity}")
+                    # print(f"[STRUM] Pressure: {pressure:.4f}, MIDI velocity: {midi_velocity}")
                     
                     # Store velocity for potential release event
                     self.last_strum_velocity = midi_velocity
                     
-                    note = self._notes[self.pending_tap_index]
-                    self.last_strummed_index = self.pending_tap_index
+                    string_index = self.pending_tap_index
+                    note = notes[string_index]
+                    self.last_strummed_index = string_index
                     self.pending_tap_index = -1
                     self.pressure_buffer.clear()
                     
-                    return {'type': 'strum', 'notes': [{'note': note, 'velocity': midi_velocity}]}
+                    return {'type': 'strum', 'notes': [{'note': note, 'velocity': midi_velocity, 'string': string_index}]}
                 
                 return None  # Still buffering
             
@@ -167,7 +334,7 @@ class Strummer(EventEmitter):
             if has_sufficient_pressure and self.last_strummed_index != -1 and self.last_strummed_index != index:
                 # Strumming across strings - use current pressure
                 # Minimum velocity of 20 for audibility
-                midi_velocity = max(20, int(pressure * 127))
+                midi_velocity = self._strum_velocities[min(int(pressure * _VELOCITY_TABLE_MAX), _VELOCITY_TABLE_MAX)]
                 # print(f"[STRUM] Cross-string: pressure={pressure:.4f}, midi_velocity={midi_velocity}")
                 notes_to_play = []
 
@@ -180,10 +347,11 @@ class Strummer(EventEmitter):
                     indices = range(self.last_strummed_index - 1, index - 1, -1)
                 
                 for i in indices:
-                    note = self._notes[i]
+                    note = notes[i]
                     notes_to_play.append({
                         'note': note,
-                        'velocity': midi_velocity
+                        'velocity': midi_velocity,
+                        'string': i
                     })
                 
                 # Store velocity for potential release event
@@ -204,15 +372,47 @@ class Strummer(EventEmitter):
         self.pressure_buffer.clear()
         self.pending_tap_index = -1
 
-    def configure(self, pluck_velocity_scale: float = 4.0, pressure_threshold: float = 0.1) -> None:
-        """Configure strummer parameters"""
-        self.velocity_scale = pluck_velocity_scale
+    def configure(self, pressure_threshold: float = 0.1,
+                  string_widths: Optional[Sequence[float]] = None, primary_string_width: float = 1.0,
+                  dead_zone: float = 0.0, hysteresis: float = 0.0, velocity_curve: float = 1.0) -> None:
+        """
+        Configure strummer parameters
+        
+        Args:
+            pressure_threshold: Minimum pressure to trigger a strum
+            string_widths: Relative width of each string from the left (missing strings are 1.0)
+            primary_string_width: Relative width multiplier for strings that are not part of the spread
+            dead_zone: Width of the band around each string boundary that triggers no string (fraction of width)
+            hysteresis: Distance past a boundary needed to move to the next string (fraction of width)
+            velocity_curve: Response curve of pressure to velocity, as for datahelpers.apply_curve
+                (must be positive; anything else falls back to linear)
+        """
+        if velocity_curve <= 0:
+            print(f"[STRUM] Warning: velocityCurve must be positive (got {velocity_curve}), using 1.0")
+            velocity_curve = 1.0
+        
+        # Velocity tables depend only on these, so only rebuild them when they change
+        if pressure_threshold != self.pressure_threshold or velocity_curve != self.velocity_curve:
+            self._tap_velocities = build_velocity_table(velocity_curve, pressure_threshold)
+            self._strum_velocities = build_velocity_table(velocity_curve)
         self.pressure_threshold = pressure_threshold
+        self.velocity_curve = velocity_curve
+        with self._layout_lock:
+            self._string_widths = tuple(float(w) for w in (string_widths or ()))
+            self._primary_string_width = float(primary_string_width)
+            self._dead_zone = max(0.0, float(dead_zone))
+            self._hysteresis = max(0.0, float(hysteresis))
+            layout = self._layout
+            self._layout = self._build_layout(layout.notes, layout.base_notes, layout.width, layout.height,
+                                              layout.version)
 
     def update_bounds(self, width: float, height: float) -> None:
         """Update the bounds of the strummer"""
-        self._width = width
-        self._height = height
+        with self._layout_lock:
+            layout = self._layout
+            if width == layout.width and height == layout.height:
+                return
+            self._layout = self._build_layout(layout.notes, layout.base_notes, width, height, layout.version)
 
 
 # Global strummer instance
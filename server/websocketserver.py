@@ -1,11 +1,11 @@
 import asyncio
 import websockets
-from typing import Set, Callable, Optional, Dict, Any
+from typing import Set, Callable, Optional, Dict, Any, Union
 import json
 
 
 class SocketServer:
-    def __init__(self, on_message: Optional[Callable[[Dict[str, Any]], None]] = None, config_callback: Optional[Callable[[], Dict[str, Any]]] = None, initial_notes_callback: Optional[Callable[[], Dict[str, Any]]] = None, device_status_callback: Optional[Callable[[], Dict[str, Any]]] = None):
+    def __init__(self, on_message: Optional[Callable[[Dict[str, Any]], None]] = None, config_callback: Optional[Callable[[], Dict[str, Any]]] = None, initial_notes_callback: Optional[Callable[[], Union[Dict[str, Any], str]]] = None, device_status_callback: Optional[Callable[[], Dict[str, Any]]] = None):
         self.sockets: Set[websockets.WebSocketServerProtocol] = set()
         self.server = None
         self.loop = None
@@ -39,8 +39,9 @@ class SocketServer:
             # Send the current strummer notes to the new client
             if self.initial_notes_callback is not None:
                 try:
+                    # The callback may return a payload that is already serialized
                     notes_data = self.initial_notes_callback()
-                    notes_message = json.dumps(notes_data)
+                    notes_message = notes_data if isinstance(notes_data, str) else json.dumps(notes_data)
                     await websocket.send(notes_message)
                 except Exception as e:
                     print(f'Error sending initial notes to new client: {e}')
@@ -80,8 +80,8 @@ export class SettingsController implements ReactiveController {
             default: 64
         },
         strumming: {
-            pluckVelocityScale: 4.0,
             pressureThreshold: 0.1,
+            velocityCurve: 1.0,
             midiChannel: 10,
             initialNotes: ['C4', 'E4', 'G4'],
             upperNoteSpread: 3,
@@ -385,8 +385,8 @@ export class SettingsController implements ReactiveController {
                 default: 64
             },
             strumming: {
-                pluckVelocityScale: 4.0,
                 pressureThreshold: 0.1,
+                velocityCurve: 1.0,
                 midiChannel: 10,
                 initialNotes: ['C4', 'E4', 'G4'],
                 upperNoteSpread: 3,
@@ -203,13 +203,6 @@ export const PANEL_SCHEMAS: Record<string, PanelSchema> = {
         size: 'small',
         configKey: 'strumming',
         controls: [
-            {
-                type: 'number',
-                label: 'Pluck Velocity Scale',
-                key: 'pluckVelocityScale',
-                step: 0.1,
-                min: 0
-            },
             {
                 type: 'number',
                 label: 'Pressure Threshold',
@@ -218,6 +211,13 @@ export const PANEL_SCHEMAS: Record<string, PanelSchema> = {
                 min: 0,
                 max: 1
             },
+            {
+                type: 'number',
+                label: 'Velocity Curve',
+                key: 'velocityCurve',
+                step: 0.1,
+                min: 0.1
+            },
             {
                 type: 'number',
                 label: 'MIDI Channel',
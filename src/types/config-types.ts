@@ -14,8 +14,8 @@ export interface TabletExpressionConfig {
 }
 
 export interface StrummingConfig {
-    pluckVelocityScale: number;
     pressureThreshold: number;
+    velocityCurve: number;
     midiChannel: number;
     initialNotes: string[];
     upperNoteSpread: number;